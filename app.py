@@ -1,153 +1,540 @@
-from flask import Flask, render_template, request, send_file, url_for, redirect, abort
+from flask import Flask, Response, render_template, request, send_file, url_for, redirect, abort, jsonify
 from werkzeug.utils import secure_filename
-from processing.download import download_youtube_video
+from processing.download import download_youtube_video, list_playlist
 import os
+import json
+import time
+import multiprocessing
 from processing.summarize_video import summarize
 from processing.summarize_text import summarizeText
+from processing.extractive import summarizeExtractive, EXTRACTIVE_RATIO, REDUNDANCY_THRESHOLD
 from processing.summarize_audio import extract_audio_from_video,create_audio_summary
+from processing.models import warm_up, model_stats, inference_backend, generation_beams
+from processing.jobs import submit_job, get_job, report_stage, report_progress, report_preview, start_workers, queue_depth, QueueFullError, STAGES
+from processing.batch import run_pipelined, BATCH_MAX_ITEMS
+from processing.metrics import render_prometheus, load_trace
+from processing.workspace import create_workspace, workspace_dir, release_workspace, register_artifact, resolve_artifact
+from processing.result_cache import cache_key, source_id_for_url, source_id_for_file, lookup, store, materialize, cache_stats
+from processing.transcribe import WHISPER_MODEL, hash_file
+from processing.uploads import create_upload, append_chunk, get_upload, take_upload, save_stream, max_upload_bytes, UploadError
+from processing.summary_text import T5_MODEL, T5_NUM_BEAMS
+from processing.summarize_text import model_name as BART_MODEL, CHUNK_OVERLAP_TOKENS, BART_NUM_BEAMS
+from processing.timestamps import EMBEDDING_MODEL
+from processing.segments import SEGMENT_GAP_TOLERANCE, SEGMENT_MIN_LENGTH, SEGMENT_MAX_LENGTH, SEGMENT_PADDING
+from processing.generatevideo import CLIP_MODE
+from processing.streaming import STREAMING_PIPELINE
+from processing.download import MAX_VIDEO_HEIGHT
+from processing.summarize_audio import SILENCE_TOP_DB, CROSSFADE_MS
 
 app = Flask(__name__)
+app.config["MAX_CONTENT_LENGTH"] = max_upload_bytes()  # Reject oversized uploads before reading them
 
-# Folder paths
-DOWNLOAD_FOLDER = "downloads"
-UPLOAD_FOLDER = "uploads"
-os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)  # Ensure folders exist
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-
-app.config["DOWNLOAD_FOLDER"] = DOWNLOAD_FOLDER
-app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+# Comma-separated "kind:name" models to load at startup, e.g. "whisper:tiny,t5:t5-small"
+WARMUP_MODELS = os.environ.get("WARMUP_MODELS", "")
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+# Result page for each summarization type
+RESULT_VIEWS = {
+    'summarized_video': 'display_video',
+    'summarized_text': 'display_text',
+    'summarized_audio': 'display_audio',
+    'summarized_extractive': 'display_text',
+    'summarized_extractive_video': 'display_video',
+}
+
+# Output file name and artifact kind for each summarization type
+OUTPUT_FILES = {
+    'summarized_video': ("output_video.mp4", "video"),
+    'summarized_text': ("summary.txt", "text"),
+    'summarized_audio': ("clipped_audio.wav", "audio"),
+    'summarized_extractive': ("extractive_summary.txt", "text"),
+    'summarized_extractive_video': ("output_video.mp4", "video"),
+}
+
+def pipeline_params(summarization_type):
+    """Models and parameters that affect the output of a summarization type (part of the result cache key)."""
+    if summarization_type == 'summarized_video':
+        return {
+            "whisper": WHISPER_MODEL, "t5": T5_MODEL, "embedding": EMBEDDING_MODEL,
+            "segments": [SEGMENT_GAP_TOLERANCE, SEGMENT_MIN_LENGTH, SEGMENT_MAX_LENGTH, SEGMENT_PADDING],
+            "clip_mode": CLIP_MODE, "max_height": MAX_VIDEO_HEIGHT,
+            "backend": inference_backend(), "t5_beams": generation_beams(T5_NUM_BEAMS),
+            "streaming": STREAMING_PIPELINE,
+        }
+    if summarization_type == 'summarized_text':
+        return {"whisper": WHISPER_MODEL, "bart": BART_MODEL, "chunk_overlap": CHUNK_OVERLAP_TOKENS,
+                "backend": inference_backend(), "bart_beams": generation_beams(BART_NUM_BEAMS),
+                "streaming": STREAMING_PIPELINE}
+    if summarization_type == 'summarized_extractive':
+        return {"whisper": WHISPER_MODEL, "embedding": EMBEDDING_MODEL, "backend": inference_backend(),
+                "ratio": EXTRACTIVE_RATIO, "redundancy": REDUNDANCY_THRESHOLD, "streaming": STREAMING_PIPELINE}
+    if summarization_type == 'summarized_extractive_video':
+        return {
+            "whisper": WHISPER_MODEL, "embedding": EMBEDDING_MODEL, "backend": inference_backend(),
+            "ratio": EXTRACTIVE_RATIO, "redundancy": REDUNDANCY_THRESHOLD,
+            "segments": [SEGMENT_GAP_TOLERANCE, SEGMENT_MIN_LENGTH, SEGMENT_MAX_LENGTH, SEGMENT_PADDING],
+            "clip_mode": CLIP_MODE, "max_height": MAX_VIDEO_HEIGHT, "streaming": STREAMING_PIPELINE,
+        }
+    return {"top_db": SILENCE_TOP_DB, "crossfade_ms": CROSSFADE_MS}
+
+def fetch_source(work_dir, youtube_url, video_path, summarization_type):
+    """Downloads a YouTube source into work_dir; uploaded/local files are returned as they are."""
+    if not youtube_url:
+        return video_path
+
+    report_stage("download")
+    print("🎥 Downloading YouTube video...")
+    # Only video summaries need the picture; other modes fetch audio only
+    download_mode = "video" if OUTPUT_FILES[summarization_type][1] == "video" else "audio"
+    video_path = download_youtube_video(youtube_url, work_dir, download_mode)  # Returns full path
+
+    if not video_path or not os.path.exists(video_path):
+        raise RuntimeError("Failed to download video.")
+
+    print(f"✅ Video downloaded successfully: {video_path}")
+    return video_path
+
+def summarize_source(work_dir, video_path, summarization_type, on_preview=None):
+    """Runs the pipeline for a summarization type and returns the output path.
+
+    Video summaries may call on_preview(path) with a quick low-resolution render first.
+    """
+    output_path = os.path.join(work_dir, OUTPUT_FILES[summarization_type][0])
+
+    if summarization_type == 'summarized_video':
+        print("📽️ Starting video summarization...")
+        output_path = summarize(video_path, work_dir, output_path, on_preview=on_preview)
+        print(f"✅ Summarized video saved at: {output_path}")
+    elif summarization_type == 'summarized_text':
+        print("📽️ Starting text summarization...")
+        output_path = summarizeText(video_path, work_dir)
+        print(f"✅ Summarized text saved at: {output_path}")
+    elif summarization_type == 'summarized_extractive':
+        print("📽️ Starting extractive summarization...")
+        output_path = summarizeExtractive(video_path, work_dir)
+        print(f"✅ Extractive summary saved at: {output_path}")
+    elif summarization_type == 'summarized_extractive_video':
+        print("📽️ Starting extractive video summarization...")
+        output_path = summarize(video_path, work_dir, output_path, on_preview=on_preview, extractive=True)
+        print(f"✅ Summarized video saved at: {output_path}")
+    elif summarization_type == 'summarized_audio':
+        print("📽️ Starting audio summarization...")
+        report_stage("extract")
+        output=extract_audio_from_video(video_path, work_dir)
+        output_path=create_audio_summary(output, output_path)
+        print(f"✅ Summarized audio saved at: {output_path}")
+
+    if not output_path or not os.path.exists(output_path):
+        raise RuntimeError("Pipeline finished without producing an output file.")
+    return output_path
+
+def publish_output(workspace_id, output_path, summarization_type, result_key=None):
+    """Stores an output in the result cache under result_key and returns its artifact ID."""
+    if result_key:
+        try:
+            store(result_key, output_path, {"type": summarization_type})
+        except OSError as e:
+            print(f"⚠️ Could not cache result: {e}")  # The job itself still succeeded
+    return register_artifact(workspace_id, output_path, OUTPUT_FILES[summarization_type][1])
+
+def run_pipeline(workspace_id, youtube_url, video_path, summarization_type, result_key=None):
+    """Runs one /process request on a background worker inside its own workspace.
+
+    Stores the output in the result cache under result_key and returns its artifact ID.
+    """
+    work_dir = workspace_dir(workspace_id)
+    try:
+        video_path = fetch_source(work_dir, youtube_url, video_path, summarization_type)
+        # The preview becomes playable through the job status while the full render runs
+        on_preview = lambda path: report_preview(register_artifact(workspace_id, path, "video"))
+        output_path = summarize_source(work_dir, video_path, summarization_type, on_preview)
+        return publish_output(workspace_id, output_path, summarization_type, result_key)
+    finally:
+        release_workspace(workspace_id)
+
+def expand_sources(sources):
+    """Expands playlist URLs into one source per video; file sources are kept as they are."""
+    items = []
+    for source in sources:
+        if not source.get("url"):
+            items.append(source)
+            continue
+        try:
+            urls = list_playlist(source["url"])
+        except Exception as e:
+            print(f"⚠️ Could not list {source['url']} as a playlist: {e}")
+            urls = [source["url"]]
+        items.extend({"url": url} for url in urls)
+    if len(items) > BATCH_MAX_ITEMS:
+        print(f"⚠️ Batch truncated to {BATCH_MAX_ITEMS} of {len(items)} items")
+    return items[:BATCH_MAX_ITEMS]
+
+def run_batch(workspace_id, sources, summarization_type):
+    """Runs a batch job and returns the artifact ID of its combined index.
+
+    `sources` are {"url"} entries (playlists are expanded) or {"path", "hash"} entries
+    for local files. Every item gets its own workspace, result cache entry and
+    artifact; the next item is fetched while the current one is summarized.
+    """
+    def fetch(item):
+        item_workspace = create_workspace()
+        try:
+            if item.get("url"):
+                source_id = source_id_for_url(item["url"])
+            else:
+                source_id = source_id_for_file(item.get("hash") or hash_file(item["path"]))
+            result_key = cache_key(source_id, summarization_type, pipeline_params(summarization_type))
+            cached_path = lookup(result_key)
+            if cached_path:
+                return {"workspace": item_workspace, "cached": materialize(cached_path, workspace_dir(item_workspace))}
+            video_path = fetch_source(workspace_dir(item_workspace), item.get("url"), item.get("path"), summarization_type)
+            return {"workspace": item_workspace, "video_path": video_path, "result_key": result_key}
+        except Exception:
+            release_workspace(item_workspace)
+            raise
+
+    def process(item, fetched):
+        item_workspace = fetched["workspace"]
+        try:
+            if "cached" in fetched:
+                return register_artifact(item_workspace, fetched["cached"], OUTPUT_FILES[summarization_type][1]), True
+            output_path = summarize_source(workspace_dir(item_workspace), fetched["video_path"], summarization_type)
+            return publish_output(item_workspace, output_path, summarization_type, fetched["result_key"]), False
+        finally:
+            release_workspace(item_workspace)
+
+    try:
+        report_stage("download")
+        items = expand_sources(sources)
+        print(f"📚 Batch of {len(items)} items ({summarization_type})")
+        report_progress(0, len(items))
+
+        entries = []
+        for item, result, error in run_pipelined(items, fetch, process):
+            entry = {"source": item.get("url") or os.path.basename(item["path"]), "status": "done", "artifact_id": None, "cached": False, "error": None}
+            if error is None:
+                entry["artifact_id"], entry["cached"] = result
+            else:
+                print(f"❌ Batch item {entry['source']} failed: {error}")
+                entry.update(status="failed", error=str(error))
+            entries.append(entry)
+            report_progress(len(entries), len(items))
+
+        index_path = os.path.join(workspace_dir(workspace_id), "index.json")
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump({"type": summarization_type, "created_at": time.time(), "items": entries}, f, indent=2)
+        return register_artifact(workspace_id, index_path, "index")
+    finally:
+        release_workspace(workspace_id)
+
+def wants_json():
+    return request.accept_mimetypes.best == 'application/json'
+
 @app.route('/process', methods=['POST'])
 def process():
     youtube_url = request.form.get('youtubeUrl')  # Get YouTube URL
     summarization_type = request.form.get('summarization_type')  # Get summarization type
     video_file = request.files.get('videoFile')  # Get uploaded video file
+    upload_id = request.form.get('uploadId')  # Finished chunked upload, if any
 
     print("📩 Received Form Data:", request.form)
     print("📂 Received Files:", request.files)
 
     video_path = None  # Initialize video_path
 
-    if youtube_url:
-        print("🎥 Downloading YouTube video...")
-        video_path = download_youtube_video(youtube_url)  # Returns full path
-
-        if not video_path or not os.path.exists(video_path):
-            print("❌ Error: Video download failed!")
-            return "Failed to download video.", 400
-
-        print(f"✅ Video downloaded successfully: {video_path}")
-
-    elif video_file and video_file.filename:
-        filename = secure_filename(video_file.filename)  # Secure filename
-        video_path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-        video_file.save(video_path)  # Save uploaded file
-        print(f"✅ Video file saved at: {video_path}")
-
-    else:
-        print("⚠️ No valid input received.")
-        return "❌ Error: Provide either a YouTube URL or upload a video file.", 400  # Return proper error response
-
     # Ensure summarization type is provided
     if not summarization_type:
         return "⚠️ Please select a summarization type.", 400
+    if summarization_type not in RESULT_VIEWS:
+        return "❌ Error: Invalid summarization type.", 400  # Handle invalid summarization types
 
-    if summarization_type == 'summarized_video':
-        print("📽️ Starting video summarization...")
-        output_path = summarize(video_path)
-
-        
-
-        print(f"✅ Summarized video saved at: {output_path}")
-        output_filename = os.path.basename(output_path)
-        return redirect(url_for('display_video', filename=output_filename))
-    if summarization_type == 'summarized_text':
-        print("📽️ Starting video summarization...")
-        output_path = summarizeText(video_path)
-
-        
-
-        print(f"✅ Summarized video saved at: {output_path}")
-        output_filename = os.path.basename(output_path)
-        return redirect(url_for('display_text', filename=output_filename))
-    if summarization_type == 'summarized_audio':
-        print("📽️ Starting video summarization...")
-        output=extract_audio_from_video(video_path)
-        output_path=create_audio_summary(output)
-       
-        
-
-        print(f"✅ Summarized audio saved at: {output_path}")
-        output_filename = os.path.basename(output_path)
-        return redirect(url_for('display_audio', filename=output_filename))
-
-    return "❌ Error: Invalid summarization type.", 400  # Handle invalid summarization types
-VIDEO_FILE = "output_video.mp4"
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-@app.route('/video')
-def display_video():
-    return render_template('video.html', video_filename=VIDEO_FILE)
-
-@app.route('/serve_video')
-def serve_video():
-    video_path = os.path.join(BASE_DIR, VIDEO_FILE)  # Use BASE_DIR instead of DOWNLOAD_FOLDER
-
-    if os.path.exists(video_path):
-        return send_file(video_path, mimetype="video/mp4", as_attachment=False)
-
-    print("❌ Error: Video file not found:", video_path)
-    return abort(404, "Video not found.")
-
-TEXT_FILE = "summary.txt"
-@app.route('/text')
-def display_text():
-
-    text_path = os.path.join(BASE_DIR, TEXT_FILE)
-
-    if os.path.exists(text_path):
-        with open(text_path, "r", encoding="utf-8") as file:
-            summary_text = file.read()  # Read the content of the file
-        
-        return render_template('text.html', summary_text=summary_text, text_filename=TEXT_FILE)
-
-@app.route('/serve_text')
-def serve_text():
-    text_path = os.path.join(BASE_DIR, TEXT_FILE)
-
-    if os.path.exists(text_path):
-        return send_file(text_path, mimetype="text/plain", as_attachment=False)
-
-    print("❌ Error: Text file not found:", text_path)
-    return abort(404, "Text file not found.")
-
-AUDIO_FILE = 'clipped_audio.wav'
-@app.route('/audio')
-def display_audio():
-    audio_path = os.path.join(BASE_DIR, AUDIO_FILE)
-
-    if os.path.exists(audio_path):
-        # You can include an audio player in your HTML page
-        return render_template('audio.html', audio_filename=AUDIO_FILE)
-
-    print("❌ Error: Audio file not found:", audio_path)
-    return abort(404, "Audio file not found.")
-
-@app.route('/serve_audio')
-def serve_audio():
-    audio_path = os.path.join(BASE_DIR, AUDIO_FILE)
+    if not youtube_url and not upload_id and not (video_file and video_file.filename):
+        print("⚠️ No valid input received.")
+        return "❌ Error: Provide either a YouTube URL or upload a video file.", 400  # Return proper error response
 
-    if os.path.exists(audio_path):
-        return send_file(audio_path, mimetype="audio/mp3", as_attachment=False)
+    workspace_id = create_workspace()  # Every job gets its own directory
 
-    print("❌ Error: Audio file not found:", audio_path)
-    return abort(404, "Audio file not found.")
+    if youtube_url:
+        source_id = source_id_for_url(youtube_url)
+
+    elif upload_id:
+        # Hand the chunked upload straight to the job; its hash was computed while receiving it
+        try:
+            video_path, file_hash = take_upload(upload_id, workspace_dir(workspace_id))
+        except UploadError as e:
+            release_workspace(workspace_id)
+            return f"❌ Error: {e}", e.status
+        print(f"✅ Upload {upload_id} moved to: {video_path}")
+        source_id = source_id_for_file(file_hash)
 
+    else:
+        filename = "upload_" + (secure_filename(video_file.filename) or "video.mp4")  # Secure filename
+        video_path = os.path.join(workspace_dir(workspace_id), filename)
+        try:
+            file_hash = save_stream(video_file.stream, video_path)  # Save uploaded file, hashing as it is written
+        except UploadError as e:
+            release_workspace(workspace_id)
+            return f"❌ Error: {e}", e.status
+        print(f"✅ Video file saved at: {video_path}")
+        source_id = source_id_for_file(file_hash)
+
+    # Answer repeated requests straight from the result cache
+    result_key = cache_key(source_id, summarization_type, pipeline_params(summarization_type))
+    cached_path = lookup(result_key)
+    if cached_path:
+        kind = OUTPUT_FILES[summarization_type][1]
+        artifact_id = register_artifact(workspace_id, materialize(cached_path, workspace_dir(workspace_id)), kind)
+        release_workspace(workspace_id)
+        view_url = url_for(RESULT_VIEWS[summarization_type], artifact_id=artifact_id)
+        if wants_json():
+            return jsonify({"artifact_id": artifact_id, "cached": True, "view_url": view_url})
+        return redirect(view_url)
 
+    if youtube_url:
+        print("🎥 YouTube video will be downloaded by the worker.")  # Keeps the request short
+
+    try:
+        job_id = submit_job(summarization_type, run_pipeline, workspace_id, youtube_url, video_path, summarization_type, result_key)
+    except QueueFullError as e:
+        print(f"❌ {e}")
+        release_workspace(workspace_id)
+        return "❌ Server is busy, please try again shortly.", 503
+
+    print(f"🧾 Queued job {job_id} ({summarization_type})")
+    if wants_json():
+        return jsonify({"job_id": job_id, "status_url": url_for('job_status', job_id=job_id)}), 202
+    return redirect(url_for('job_page', job_id=job_id))
+
+@app.route('/batch', methods=['POST'])
+def batch():
+    """Queues a batch: a playlist URL and/or lists of video URLs and finished upload IDs."""
+    payload = request.get_json(silent=True)
+    if payload is None:
+        payload = {
+            "summarization_type": request.form.get('summarization_type'),
+            "playlistUrl": request.form.get('playlistUrl'),
+            "urls": request.form.getlist('urls'),
+            "uploadIds": request.form.getlist('uploadIds'),
+        }
+
+    summarization_type = payload.get('summarization_type')
+    if summarization_type not in RESULT_VIEWS:
+        return jsonify({"error": "Invalid or missing summarization type."}), 400
+
+    urls = [url for url in [payload.get('playlistUrl')] + list(payload.get('urls') or []) if url]
+    upload_ids = [upload_id for upload_id in payload.get('uploadIds') or [] if upload_id]
+    if not urls and not upload_ids:
+        return jsonify({"error": "Provide a playlist URL, video URLs or upload IDs."}), 400
+    if len(urls) + len(upload_ids) > BATCH_MAX_ITEMS:
+        return jsonify({"error": f"A batch holds at most {BATCH_MAX_ITEMS} items."}), 400
+
+    workspace_id = create_workspace()
+    sources = [{"url": url} for url in urls]
+    for i, upload_id in enumerate(upload_ids):
+        try:
+            # Each upload gets its own directory so equal filenames cannot collide
+            path, file_hash = take_upload(upload_id, os.path.join(workspace_dir(workspace_id), f"input_{i}"))
+        except UploadError as e:
+            release_workspace(workspace_id)
+            return jsonify({"error": f"Upload {upload_id}: {e}"}), e.status
+        sources.append({"path": path, "hash": file_hash})
+
+    try:
+        job_id = submit_job("batch", run_batch, workspace_id, sources, summarization_type)
+    except QueueFullError as e:
+        print(f"❌ {e}")
+        release_workspace(workspace_id)
+        return jsonify({"error": "Server is busy, please try again shortly."}), 503
+
+    print(f"🧾 Queued batch job {job_id} ({len(sources)} sources, {summarization_type})")
+    return jsonify({"job_id": job_id, "status_url": url_for('job_status', job_id=job_id)}), 202
+
+@app.route('/uploads', methods=['POST'])
+def start_upload():
+    payload = request.get_json(silent=True) or request.form
+    try:
+        state = create_upload(secure_filename(payload.get('filename', '')), payload.get('size'))
+    except UploadError as e:
+        return jsonify({"error": str(e)}), e.status
+    return jsonify(state), 201
+
+@app.route('/uploads/<upload_id>', methods=['GET'])
+def upload_status(upload_id):
+    try:
+        return jsonify(get_upload(upload_id))
+    except UploadError as e:
+        return jsonify({"error": str(e)}), e.status
+
+@app.route('/uploads/<upload_id>', methods=['PUT'])
+def upload_chunk(upload_id):
+    offset = request.headers.get('Upload-Offset', request.args.get('offset'))
+    try:
+        state = append_chunk(upload_id, offset, request.stream)
+    except UploadError as e:
+        response = {"error": str(e)}
+        if e.status == 409:
+            try:
+                response["offset"] = get_upload(upload_id)["offset"]  # Where the client should resume
+            except UploadError:
+                pass
+        return jsonify(response), e.status
+    return jsonify(state)
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return abort(404, "Job not found.")
+
+    response = {key: job[key] for key in ("id", "kind", "status", "stage", "stages", "progress", "error", "created_at", "started_at", "finished_at")}
+    response["stage_order"] = STAGES
+    if job["status"] == "done":
+        response["artifact_id"] = job["result"]
+        response["result_url"] = url_for('job_result', job_id=job_id)
+        if job["kind"] in RESULT_VIEWS:  # Batch jobs produce an index rather than a viewable result
+            response["view_url"] = url_for(RESULT_VIEWS[job["kind"]], artifact_id=job["result"])
+    elif job["preview"]:
+        response["preview_url"] = url_for('display_video', artifact_id=job["preview"], job=job_id)
+    if job["status"] in ("done", "failed"):
+        response["trace_url"] = url_for('job_trace', job_id=job_id)
+    return jsonify(response)
+
+@app.route('/jobs/<job_id>/trace')
+def job_trace(job_id):
+    trace = load_trace(job_id)
+    if trace is None:
+        return abort(404, "Trace not found.")
+    return jsonify(trace)
+
+@app.route('/jobs/<job_id>/view')
+def job_page(job_id):
+    if get_job(job_id) is None:
+        return abort(404, "Job not found.")
+    return render_template('job.html', job_id=job_id)
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return abort(404, "Job not found.")
+    if job["status"] != "done":
+        return jsonify({"status": job["status"], "error": job["error"]}), 409
+
+    return redirect(url_for('serve_artifact', artifact_id=job["result"]))
+
+# Mimetype for each artifact kind
+ARTIFACT_MIMETYPES = {
+    "video": "video/mp4",
+    "text": "text/plain",
+    "audio": "audio/wav",
+    "index": "application/json",
+}
+
+# Artifacts never change once written, so clients may cache them for this long
+ARTIFACT_MAX_AGE = int(os.environ.get("ARTIFACT_MAX_AGE", str(24 * 3600)))
+
+def send_artifact(path, mimetype):
+    """Streams an artifact with byte-range, ETag/Last-Modified and cache header support.
+
+    Range requests let the <video>/<audio> players seek without re-downloading, and
+    conditional requests are answered with 304 when the client's copy is current.
+    """
+    response = send_file(path, mimetype=mimetype, as_attachment=False,
+                         conditional=True, etag=True, max_age=ARTIFACT_MAX_AGE)
+    response.headers["Accept-Ranges"] = "bytes"
+    return response
+
+def find_artifact(artifact_id, kind):
+    """Returns the path of an artifact of the given kind, aborting with 404 otherwise."""
+    artifact = resolve_artifact(artifact_id)
+    if artifact is None or artifact[1] != kind:
+        print(f"❌ Error: {kind} artifact not found:", artifact_id)
+        abort(404, f"{kind.capitalize()} not found.")
+    return artifact[0]
+
+@app.route('/artifacts/<artifact_id>')
+def serve_artifact(artifact_id):
+    artifact = resolve_artifact(artifact_id)
+    if artifact is None:
+        return abort(404, "Artifact not found.")
+    path, kind = artifact
+    return send_artifact(path, ARTIFACT_MIMETYPES.get(kind))
+
+@app.route('/video/<artifact_id>')
+def display_video(artifact_id):
+    find_artifact(artifact_id, "video")
+    # Set when showing a preview: the page swaps in the full render once the job is done
+    job_id = request.args.get('job')
+    return render_template('video.html', artifact_id=artifact_id, job_id=job_id if job_id and get_job(job_id) else None)
+
+@app.route('/serve_video/<artifact_id>')
+def serve_video(artifact_id):
+    video_path = find_artifact(artifact_id, "video")
+    return send_artifact(video_path, "video/mp4")
+
+@app.route('/text/<artifact_id>')
+def display_text(artifact_id):
+    text_path = find_artifact(artifact_id, "text")
+
+    with open(text_path, "r", encoding="utf-8") as file:
+        summary_text = file.read()  # Read the content of the file
+    
+    return render_template('text.html', summary_text=summary_text, artifact_id=artifact_id)
+
+@app.route('/serve_text/<artifact_id>')
+def serve_text(artifact_id):
+    text_path = find_artifact(artifact_id, "text")
+    return send_artifact(text_path, "text/plain")
+
+@app.route('/audio/<artifact_id>')
+def display_audio(artifact_id):
+    find_artifact(artifact_id, "audio")
+    # You can include an audio player in your HTML page
+    return render_template('audio.html', artifact_id=artifact_id)
+
+@app.route('/serve_audio/<artifact_id>')
+def serve_audio(artifact_id):
+    audio_path = find_artifact(artifact_id, "audio")
+    return send_artifact(audio_path, "audio/wav")
+
+@app.route('/models')
+def models():
+    return jsonify(model_stats())
+
+@app.route('/cache')
+def cache():
+    return jsonify(cache_stats())
+
+@app.route('/metrics')
+def metrics():
+    loaded = model_stats()
+    gauges = {
+        "job_queue_depth": queue_depth(),
+        "models_loaded": len(loaded),
+        "models_size_bytes": int(sum(model["size_mb"] for model in loaded) * 1e6),
+    }
+    counters = {f"result_cache_{name}_total": value for name, value in cache_stats().items()}
+    return Response(render_prometheus(gauges, counters), mimetype="text/plain; version=0.0.4")
+
+def start_background():
+    """Loads WARMUP_MODELS and starts the job workers in the process that serves requests.
+
+    Runs at import so WSGI servers get it too. Under `python app.py` the debug
+    reloader's parent only watches files (the child has WERKZEUG_RUN_MAIN set), so
+    it skips the work. Spawned worker processes (e.g. transcription shards)
+    re-import this module as __mp_main__ and skip it as well.
+    """
+    if __name__ == '__mp_main__' or multiprocessing.parent_process() is not None:
+        return
+    if __name__ == '__main__' and os.environ.get("WERKZEUG_RUN_MAIN") != "true":
+        return
+    warm_up(WARMUP_MODELS.split(","))
+    start_workers()
+
+start_background()
 
 if __name__ == '__main__':
     app.run(debug=True)
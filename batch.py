@@ -0,0 +1,44 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+from app import run_batch, OUTPUT_FILES
+from processing.workspace import create_workspace, resolve_artifact
+
+# Command-line batch summarization, without the web server:
+#   python batch.py --type summarized_text "https://www.youtube.com/playlist?list=..."
+#   python batch.py --type summarized_audio lecture1.mp4 lecture2.mp4
+# Results are copied to --output-dir together with the combined index.json.
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a playlist, several URLs or local video files.")
+    parser.add_argument("sources", nargs="+", help="Playlist/video URLs or video file paths")
+    parser.add_argument("--type", default="summarized_text", choices=sorted(OUTPUT_FILES), help="Summarization type")
+    parser.add_argument("--output-dir", default="batch_output")
+    args = parser.parse_args(argv)
+
+    sources = [{"path": os.path.abspath(source)} if os.path.isfile(source) else {"url": source} for source in args.sources]
+    index_id = run_batch(create_workspace(), sources, args.type)
+    index_path, _ = resolve_artifact(index_id)
+    with open(index_path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for number, item in enumerate(index["items"], start=1):
+        item["file"] = None
+        artifact = resolve_artifact(item["artifact_id"]) if item["artifact_id"] else None
+        if artifact:
+            path, _ = artifact
+            item["file"] = f"{number:03d}_{os.path.basename(path)}"
+            shutil.copyfile(path, os.path.join(args.output_dir, item["file"]))
+
+    with open(os.path.join(args.output_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+
+    failed = sum(item["status"] == "failed" for item in index["items"])
+    print(f"✅ {len(index['items']) - failed}/{len(index['items'])} items summarized into {args.output_dir}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
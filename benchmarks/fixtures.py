@@ -0,0 +1,104 @@
+import os
+import subprocess
+import numpy as np
+from processing.audio_io import SAMPLE_RATE
+from processing.summarize_audio import write_wav
+
+# Deterministic benchmark inputs, generated locally: a speech-like WAV (voiced
+# "syllables" grouped into words and sentences, separated by pauses), an MP4 with an
+# ffmpeg testsrc picture carrying that audio, and a synthetic transcript with segment
+# timestamps covering the same duration. The same length always produces the same files.
+SEED = 1234
+WORDS_PER_SECOND = 2.5
+
+VOCABULARY = (
+    "the video shows how a model learns to summarize long recordings while keeping the most "
+    "important points in order so that viewers can skip ahead without missing anything that "
+    "matters for the final result of the experiment and its analysis across several speakers"
+).split()
+
+def speech_like_samples(seconds, seed=SEED):
+    """Returns int16 samples at SAMPLE_RATE that alternate voiced syllables and pauses."""
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    samples = np.zeros(total, dtype=np.float32)
+
+    position = int(0.3 * SAMPLE_RATE)
+    while position < total:
+        # A sentence: 4-12 words of 1-3 syllables each
+        for _ in range(rng.integers(4, 13)):
+            for _ in range(rng.integers(1, 4)):
+                length = int(rng.uniform(0.12, 0.28) * SAMPLE_RATE)
+                t = np.arange(length) / SAMPLE_RATE
+                f0 = rng.uniform(100, 220)
+                # Harmonics under a smooth envelope, roughly like a vowel
+                tone = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6))
+                envelope = np.sin(np.pi * np.arange(length) / length)
+                chunk = (0.3 * tone * envelope).astype(np.float32)
+                end = min(total, position + length)
+                if end > position:
+                    samples[position:end] = chunk[:end - position]
+                position += length
+            position += int(rng.uniform(0.05, 0.15) * SAMPLE_RATE)  # Between words
+        position += int(rng.uniform(0.4, 0.9) * SAMPLE_RATE)  # Between sentences
+
+    samples += rng.normal(0, 0.002, total).astype(np.float32)  # Faint noise floor
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+def synthetic_transcript(seconds, seed=SEED):
+    """Returns {"text", "segments"} shaped like processing.transcribe output."""
+    rng = np.random.default_rng(seed)
+    segments = []
+    start = 0.0
+    while start < seconds:
+        words = [VOCABULARY[i] for i in rng.integers(0, len(VOCABULARY), rng.integers(6, 16))]
+        text = " ".join(words).capitalize() + "."
+        end = min(seconds, start + len(words) / WORDS_PER_SECOND)
+        segments.append({"start": round(start, 3), "end": round(end, 3), "text": text})
+        start = end
+    return {"text": " ".join(segment["text"] for segment in segments), "segments": segments}
+
+def synthetic_plan(seconds, cuts=6, cut_seconds=4.0):
+    """Evenly spread cuts in the {"start_time", "end_time"} shape used by generate_summarized_video."""
+    step = seconds / cuts
+    return [
+        {"start_time": round(i * step, 3), "end_time": round(min(seconds, i * step + cut_seconds), 3)}
+        for i in range(cuts)
+    ]
+
+def make_wav(path, seconds):
+    if not os.path.exists(path):
+        write_wav(path, speech_like_samples(seconds), SAMPLE_RATE)
+    return path
+
+def make_video(path, wav_path, seconds):
+    """testsrc picture with the speech-like audio, encoded single-threaded so it is reproducible."""
+    if os.path.exists(path):
+        return path
+    command = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc=size=640x360:rate=25:duration={seconds}",
+        "-i", wav_path,
+        "-c:v", "libx264", "-preset", "veryfast", "-g", "50", "-pix_fmt", "yuv420p", "-threads", "1",
+        "-c:a", "aac", "-b:a", "96k",
+        "-shortest", "-map_metadata", "-1", "-fflags", "+bitexact",
+        path,
+    ]
+    subprocess.run(command, check=True)
+    return path
+
+def make_fixtures(fixture_dir, seconds):
+    """Creates (or reuses) the fixtures for one length and returns their paths and data."""
+    os.makedirs(fixture_dir, exist_ok=True)
+    wav_path = make_wav(os.path.join(fixture_dir, f"speech_{seconds}s.wav"), seconds)
+    video_path = make_video(os.path.join(fixture_dir, f"testsrc_{seconds}s.mp4"), wav_path, seconds)
+    transcript = synthetic_transcript(seconds)
+    return {
+        "seconds": seconds,
+        "wav": wav_path,
+        "video": video_path,
+        "transcript": transcript,
+        # Every fourth sentence stands in for a model summary when matching timestamps
+        "summary": " ".join(segment["text"] for segment in transcript["segments"][::4]),
+        "plan": synthetic_plan(seconds),
+    }
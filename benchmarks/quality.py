@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+
+# Quality-vs-speed report for the inference backends. Each configuration runs T5 and
+# BART summarization and the segment encoder in its own process (the backend is read
+# from the environment at import time), and is compared with the fp32 beam-search
+# baseline: ROUGE-1/2 F1 of the summaries, cosine similarity of the embeddings, speedup.
+#
+#   python -m benchmarks.quality --text-file transcript.txt
+CONFIGS = [
+    {"INFERENCE_BACKEND": "fp32", "GENERATION_MODE": "quality"},  # Baseline
+    {"INFERENCE_BACKEND": "int8", "GENERATION_MODE": "quality"},
+    {"INFERENCE_BACKEND": "fp32", "GENERATION_MODE": "fast"},
+    {"INFERENCE_BACKEND": "int8", "GENERATION_MODE": "fast"},
+]
+DEFAULT_OUTPUT = os.path.join("benchmarks", "results", "quality.json")
+
+def _ngrams(text, n):
+    words = text.lower().split()
+    return Counter(zip(*(words[i:] for i in range(n))))
+
+def rouge_f1(candidate, reference, n=1):
+    """ROUGE-N F1 over whitespace tokens."""
+    candidate, reference = _ngrams(candidate, n), _ngrams(reference, n)
+    overlap = sum((candidate & reference).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(candidate.values())
+    recall = overlap / sum(reference.values())
+    return 2 * precision * recall / (precision + recall)
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, round(time.perf_counter() - start, 4)
+
+def _worker(text_path, segments_path, output_path):
+    """Runs in a fresh interpreter with the configuration's environment."""
+    from benchmarks.run import _isolate_caches
+    from processing.embeddings import encode
+    from processing.models import inference_backend
+    from processing.summarize_text import summarize_text
+    from processing.summary_text import summarize_text_with_t5
+    from processing.timestamps import EMBEDDING_MODEL
+
+    with open(text_path, "r", encoding="utf-8") as f:
+        text = f.read()
+    with open(segments_path, "r", encoding="utf-8") as f:
+        segment_texts = json.load(f)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        _isolate_caches(cache_dir)
+        t5_summary, t5_seconds = _timed(summarize_text_with_t5, text)
+        bart_summary, bart_seconds = _timed(summarize_text, text)
+        embeddings, encode_seconds = _timed(encode, segment_texts, EMBEDDING_MODEL)
+
+    np.save(f"{output_path}.npy", np.asarray(embeddings, dtype=np.float32))
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "backend": inference_backend(),
+            "t5": {"summary": t5_summary, "seconds": t5_seconds},
+            "bart": {"summary": bart_summary, "seconds": bart_seconds},
+            "encode": {"seconds": encode_seconds},
+            "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        }, f)
+
+def _run_config(config, text_path, segments_path, scratch_dir, index):
+    output_path = os.path.join(scratch_dir, f"config_{index}.json")
+    env = dict(os.environ, **config)
+    command = [sys.executable, "-m", "benchmarks.quality", "--worker", output_path,
+               "--text-file", text_path, "--segments-file", segments_path]
+    subprocess.run(command, env=env, check=True)
+    with open(output_path, "r", encoding="utf-8") as f:
+        result = json.load(f)
+    result["embeddings"] = np.load(f"{output_path}.npy")
+    return result
+
+def build_report(configs, results):
+    baseline = results[0]
+    rows = []
+    for config, result in zip(configs, results):
+        # Rows are unit vectors, so the row-wise dot product is the cosine
+        cosine = np.sum(result["embeddings"] * baseline["embeddings"], axis=1)
+        rows.append({
+            "config": config,
+            "backend_in_effect": result["backend"],
+            "peak_rss_bytes": result["peak_rss_bytes"],
+            "t5": {
+                "seconds": result["t5"]["seconds"],
+                "speedup": round(baseline["t5"]["seconds"] / result["t5"]["seconds"], 3),
+                "rouge1": round(rouge_f1(result["t5"]["summary"], baseline["t5"]["summary"], 1), 4),
+                "rouge2": round(rouge_f1(result["t5"]["summary"], baseline["t5"]["summary"], 2), 4),
+            },
+            "bart": {
+                "seconds": result["bart"]["seconds"],
+                "speedup": round(baseline["bart"]["seconds"] / result["bart"]["seconds"], 3),
+                "rouge1": round(rouge_f1(result["bart"]["summary"], baseline["bart"]["summary"], 1), 4),
+                "rouge2": round(rouge_f1(result["bart"]["summary"], baseline["bart"]["summary"], 2), 4),
+            },
+            "encode": {
+                "seconds": result["encode"]["seconds"],
+                "speedup": round(baseline["encode"]["seconds"] / result["encode"]["seconds"], 3),
+                "mean_cosine": round(float(cosine.mean()), 5),
+                "min_cosine": round(float(cosine.min()), 5),
+            },
+        })
+    return rows
+
+def print_report(rows):
+    print(f"\n{'backend':<8}{'mode':<9}{'t5 x':>7}{'t5 R1':>7}{'t5 R2':>7}{'bart x':>8}{'bart R1':>8}{'bart R2':>8}{'enc x':>7}{'cos':>8}")
+    for row in rows:
+        print(f"{row['config']['INFERENCE_BACKEND']:<8}{row['config']['GENERATION_MODE']:<9}"
+              f"{row['t5']['speedup']:>7.2f}{row['t5']['rouge1']:>7.3f}{row['t5']['rouge2']:>7.3f}"
+              f"{row['bart']['speedup']:>8.2f}{row['bart']['rouge1']:>8.3f}{row['bart']['rouge2']:>8.3f}"
+              f"{row['encode']['speedup']:>7.2f}{row['encode']['mean_cosine']:>8.4f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare inference backends against the fp32 baseline.")
+    parser.add_argument("--text-file", help="Transcript to summarize (default: a synthetic one)")
+    parser.add_argument("--seconds", type=int, default=300, help="Length of the synthetic transcript")
+    parser.add_argument("--segments-file", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        _worker(args.text_file, args.segments_file, args.worker)
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="quality-") as scratch_dir:
+        if args.text_file:
+            with open(args.text_file, "r", encoding="utf-8") as f:
+                text = f.read()
+            segment_texts = [sentence.strip() for sentence in text.split(". ") if sentence.strip()]
+        else:
+            from benchmarks.fixtures import synthetic_transcript
+            transcript = synthetic_transcript(args.seconds)
+            text = transcript["text"]
+            segment_texts = [segment["text"] for segment in transcript["segments"]]
+
+        text_path = os.path.join(scratch_dir, "text.txt")
+        segments_path = os.path.join(scratch_dir, "segments.json")
+        with open(text_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        with open(segments_path, "w", encoding="utf-8") as f:
+            json.dump(segment_texts, f)
+
+        results = []
+        for index, config in enumerate(CONFIGS):
+            print(f"⏱️ {config['INFERENCE_BACKEND']} / {config['GENERATION_MODE']}...", flush=True)
+            results.append(_run_config(config, text_path, segments_path, scratch_dir, index))
+
+    rows = build_report(CONFIGS, results)
+    print_report(rows)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2)
+    print(f"✅ Report written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.fixtures import make_fixtures
+
+# Offline benchmark harness. Every (stage, fixture length) pair runs in a fresh
+# process, so its peak RSS is its own and model loads are measured as a cold first
+# run. Each timed run gets empty transcript/summary/embedding caches.
+#
+#   python -m benchmarks.run --lengths 30,120 --model bart=sshleifer/distilbart-cnn-6-6 --offline
+#   python -m benchmarks.run --baseline benchmarks/baseline.json   # diff against a saved run
+DEFAULT_OUTPUT = os.path.join("benchmarks", "results", "latest.json")
+DEFAULT_FIXTURE_DIR = os.path.join("benchmarks", "fixtures_cache")
+DEFAULT_THRESHOLD = 1.25  # Slower than baseline by this factor counts as a regression
+
+def _isolate_caches(run_dir):
+    from processing import transcribe, summary_text, embeddings
+    transcribe.TRANSCRIPT_CACHE_DIR = os.path.join(run_dir, "transcripts")
+    summary_text.SUMMARY_CACHE_DIR = os.path.join(run_dir, "summary_cache")
+    embeddings.EMBEDDING_CACHE_DIR = os.path.join(run_dir, "embeddings")
+
+def _use_stand_in_models(stand_ins):
+    """Routes every load of a model kind to the given stand-in name, e.g. {"bart": "sshleifer/distilbart-cnn-6-6"}."""
+    from processing import models
+    for kind, stand_in in stand_ins.items():
+        load = models._loaders[kind]
+        models.register_loader(kind, lambda name, load=load, stand_in=stand_in: load(stand_in))
+
+# Each stage takes (fixture, run_dir), does any untimed preparation and returns the
+# call to time.
+def _extract_audio(fx, run_dir):
+    from processing.download_audio import extract_audio_from_video
+    return lambda: extract_audio_from_video(fx["video"], run_dir)
+
+def _transcribe_text(fx, run_dir):
+    from processing.download_audio import transcribe_audio
+    return lambda: transcribe_audio(fx["wav"], run_dir)
+
+def _transcribe_timestamps(fx, run_dir):
+    from processing.timestamps import transcribe_audio
+    return lambda: transcribe_audio(fx["wav"])
+
+def _split_text(fx, run_dir):
+    from processing.summarize_text import split_text
+    return lambda: split_text(fx["transcript"]["text"])
+
+def _summarize_text_bart(fx, run_dir):
+    from processing.summarize_text import summarize_text
+    return lambda: summarize_text(fx["transcript"]["text"])
+
+def _summarize_text_t5(fx, run_dir):
+    from processing.summary_text import summarize_text_with_t5
+    return lambda: summarize_text_with_t5(fx["transcript"]["text"])
+
+def _match_timestamps(fx, run_dir):
+    from processing.timestamps import get_matching_timestamps
+    return lambda: get_matching_timestamps(fx["transcript"]["segments"], fx["summary"])
+
+def _analyze_audio(fx, run_dir):
+    from processing.summarize_audio import analyze_audio
+    return lambda: analyze_audio(fx["wav"])
+
+def _clip_audio(fx, run_dir):
+    from processing.summarize_audio import analyze_audio, clip_audio
+    _, intervals, _ = analyze_audio(fx["wav"])
+    return lambda: clip_audio(fx["wav"], intervals, os.path.join(run_dir, "clipped_audio.wav"))
+
+def _generate_video(fx, run_dir):
+    from processing.generatevideo import generate_summarized_video
+    return lambda: generate_summarized_video(fx["video"], fx["plan"], os.path.join(run_dir, "output_video.mp4"), run_dir)
+
+def _end_to_end_video(fx, run_dir):
+    from processing.summarize_video import summarize
+    return lambda: summarize(fx["video"], run_dir, os.path.join(run_dir, "output_video.mp4"))
+
+def _end_to_end_text(fx, run_dir):
+    from processing.summarize_text import summarizeText
+    return lambda: summarizeText(fx["video"], run_dir)
+
+def _end_to_end_audio(fx, run_dir):
+    from processing.download_audio import extract_audio_from_video
+    from processing.summarize_audio import create_audio_summary
+    return lambda: create_audio_summary(extract_audio_from_video(fx["video"], run_dir), os.path.join(run_dir, "clipped_audio.wav"))
+
+STAGES = {
+    "extract_audio": _extract_audio,
+    "transcribe_text": _transcribe_text,
+    "transcribe_timestamps": _transcribe_timestamps,
+    "split_text": _split_text,
+    "summarize_text_bart": _summarize_text_bart,
+    "summarize_text_t5": _summarize_text_t5,
+    "match_timestamps": _match_timestamps,
+    "analyze_audio": _analyze_audio,
+    "clip_audio": _clip_audio,
+    "generate_video": _generate_video,
+    "end_to_end_video": _end_to_end_video,
+    "end_to_end_text": _end_to_end_text,
+    "end_to_end_audio": _end_to_end_audio,
+}
+
+def _time_stage(stage, fx, stand_ins, repeat, scratch_dir):
+    """Runs in a fresh process: one cold run (includes model loads), then `repeat` timed runs."""
+    _use_stand_in_models(stand_ins)
+    timings = []
+    for i in range(repeat + 1):
+        run_dir = tempfile.mkdtemp(prefix=f"{stage}-", dir=scratch_dir)
+        try:
+            _isolate_caches(run_dir)
+            call = STAGES[stage](fx, run_dir)
+            start = time.perf_counter()
+            result = call()
+            timings.append(time.perf_counter() - start)
+            if result is None:
+                # Several pipeline helpers log and return None instead of raising
+                raise RuntimeError(f"{stage} produced no result")
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+    seconds = statistics.median(timings[1:]) if repeat else timings[0]
+    return {
+        "stage": stage,
+        "fixture_seconds": fx["seconds"],
+        "cold_seconds": round(timings[0], 4),
+        "seconds": round(seconds, 4),
+        "min_seconds": round(min(timings[1:] or timings), 4),
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        # Processing seconds per second of input media; below 1.0 is faster than real time
+        "realtime_factor": round(seconds / fx["seconds"], 4),
+    }
+
+def run_benchmarks(lengths, stages, stand_ins, repeat, fixture_dir):
+    results = []
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory(prefix="benchmarks-") as scratch_dir:
+        for seconds in lengths:
+            fx = make_fixtures(fixture_dir, seconds)
+            for stage in stages:
+                print(f"⏱️ {stage} on {seconds}s fixture...", flush=True)
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    try:
+                        result = pool.submit(_time_stage, stage, fx, stand_ins, repeat, scratch_dir).result()
+                    except Exception as e:
+                        print(f"❌ {stage} failed: {e}")
+                        result = {"stage": stage, "fixture_seconds": seconds, "error": str(e)}
+                results.append(result)
+                if "error" not in result:
+                    print(f"   {result['seconds']:.3f}s (cold {result['cold_seconds']:.3f}s), "
+                          f"RTF {result['realtime_factor']:.3f}, peak RSS {result['peak_rss_bytes'] / 1e6:.0f} MB")
+    return results
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Prints each stage against the baseline and returns the ones slower than `threshold`x."""
+    previous = {(r["stage"], r["fixture_seconds"]): r for r in baseline.get("results", []) if "error" not in r}
+    regressions = []
+    print(f"\n{'stage':<24}{'fixture':>9}{'baseline':>11}{'current':>11}{'ratio':>8}")
+    for result in results:
+        before = previous.get((result["stage"], result["fixture_seconds"]))
+        if "error" in result or before is None:
+            continue
+        ratio = result["seconds"] / before["seconds"] if before["seconds"] else float("inf")
+        flag = "  ⚠️" if ratio > threshold else ""
+        print(f"{result['stage']:<24}{result['fixture_seconds']:>8}s{before['seconds']:>10.3f}s{result['seconds']:>10.3f}s{ratio:>7.2f}x{flag}")
+        if ratio > threshold:
+            regressions.append(dict(result, baseline_seconds=before["seconds"], ratio=round(ratio, 3)))
+    return regressions
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on synthetic fixtures.")
+    parser.add_argument("--lengths", default="30,120", help="Comma-separated fixture lengths in seconds")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated stages to run")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs after the cold run")
+    parser.add_argument("--model", action="append", default=[], metavar="KIND=NAME",
+                        help="Stand-in model for a kind (whisper, t5, bart, spacy, sentence-transformer)")
+    parser.add_argument("--offline", action="store_true", help="Only use models already in the local caches")
+    parser.add_argument("--fixture-dir", default=DEFAULT_FIXTURE_DIR)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", help="Earlier results file to diff against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = _parse_args(argv)
+    stages = [stage for stage in args.stages.split(",") if stage]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        sys.exit(f"Unknown stages: {', '.join(unknown)}")
+    stand_ins = dict(spec.split("=", 1) for spec in args.model)
+    if args.offline:
+        # Inherited by the spawned stage processes
+        os.environ["HF_HUB_OFFLINE"] = "1"
+        os.environ["TRANSFORMERS_OFFLINE"] = "1"
+
+    lengths = [int(length) for length in args.lengths.split(",") if length]
+    results = run_benchmarks(lengths, stages, stand_ins, args.repeat, args.fixture_dir)
+
+    report = {
+        "created_at": time.time(),
+        "machine": {"platform": platform.platform(), "python": platform.python_version(), "cpu_count": os.cpu_count()},
+        "models": stand_ins,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} stage(s) slower than {args.threshold}x the baseline")
+            return 1
+    return 1 if any("error" in result for result in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import os
+import struct
+import subprocess
+import numpy as np
+
+# Audio format used by every downstream stage (Whisper expects 16 kHz mono)
+SAMPLE_RATE = 16000
+
+def ffmpeg_extract_wav(input_file, output_audio, sample_rate=SAMPLE_RATE):
+    """Streams the audio track of input_file into a 16-bit mono WAV at sample_rate.
+
+    ffmpeg decodes and resamples block by block, so memory use does not depend on
+    the length of the input. Raises RuntimeError if ffmpeg fails.
+    """
+    command = [
+        'ffmpeg', '-nostdin', '-i', input_file,
+        '-vn', '-ac', '1', '-ar', str(sample_rate), '-c:a', 'pcm_s16le',
+        '-y',  # Overwrite existing file if needed
+        output_audio
+    ]
+    process = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if process.returncode != 0:
+        raise RuntimeError(f"FFmpeg audio extraction failed: {process.stderr.decode(errors='replace')[-2000:]}")
+    return output_audio
+
+def ffmpeg_load_audio(input_file, sample_rate=SAMPLE_RATE):
+    """Decodes any media file to a float32 mono numpy array at sample_rate via an ffmpeg pipe."""
+    command = [
+        'ffmpeg', '-nostdin', '-i', input_file,
+        '-vn', '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', '-'
+    ]
+    process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if process.returncode != 0:
+        raise RuntimeError(f"FFmpeg audio decoding failed: {process.stderr.decode(errors='replace')[-2000:]}")
+    return np.frombuffer(process.stdout, dtype='<i2').astype(np.float32) / 32768.0
+
+def read_wav_memmap(wav_path):
+    """Memory-maps the samples of a 16-bit PCM WAV file without reading them into RAM.
+
+    Returns (samples, sample_rate). samples is a read-only int16 np.memmap shaped
+    (frames,) for mono or (frames, channels) otherwise.
+    """
+    with open(wav_path, "rb") as f:
+        riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave != b"WAVE":
+            raise ValueError(f"Not a WAV file: {wav_path}")
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"No data chunk in {wav_path}")
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", f.read(size)[:16])
+            elif chunk_id == b"data":
+                offset = f.tell()
+                break
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)  # Chunks are word aligned
+
+    if fmt is None:
+        raise ValueError(f"No fmt chunk in {wav_path}")
+    audio_format, channels, sample_rate, _, _, bits = fmt
+    if audio_format not in (1, 0xFFFE) or bits != 16:
+        raise ValueError(f"Unsupported WAV encoding in {wav_path} (format {audio_format}, {bits} bits)")
+
+    # Streamed WAVs may carry a placeholder size; trust the file length instead
+    size = min(size, os.path.getsize(wav_path) - offset)
+    frames = size // (2 * channels)
+    if frames == 0:
+        return np.zeros(0, dtype="<i2"), sample_rate
+    samples = np.memmap(wav_path, dtype="<i2", mode="r", offset=offset, shape=(frames * channels,))
+    if channels > 1:
+        samples = samples.reshape(frames, channels)
+    return samples, sample_rate
+
+def load_whisper_audio(audio_path):
+    """Returns float32 mono samples at 16 kHz for Whisper.
+
+    16 kHz mono WAVs (as written by ffmpeg_extract_wav) are read through a memory map;
+    anything else is decoded with an ffmpeg pipe.
+    """
+    try:
+        samples, sample_rate = read_wav_memmap(audio_path)
+    except ValueError:
+        return ffmpeg_load_audio(audio_path)
+    if sample_rate != SAMPLE_RATE or samples.ndim != 1:
+        return ffmpeg_load_audio(audio_path)
+    return samples.astype(np.float32) / 32768.0
@@ -0,0 +1,44 @@
+import os
+import queue
+import threading
+
+# Batch (playlist) runs are pipelined: a background thread fetches up to BATCH_PREFETCH
+# items ahead (downloads, cache lookups) while the job thread transcribes and
+# summarizes the current one with the shared models. Throughput then tends towards the
+# slower of the two stages rather than their sum.
+BATCH_PREFETCH = int(os.environ.get("BATCH_PREFETCH", "2"))
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", "200"))
+
+_DONE = object()
+
+def run_pipelined(items, fetch, process, prefetch=BATCH_PREFETCH):
+    """Yields (item, result, error) for every item, in order.
+
+    `fetch(item)` runs on a background thread at most `prefetch` items ahead of
+    `process(item, fetched)`, which runs on the calling thread. A failing item is
+    reported with its exception and does not stop the rest of the batch.
+    """
+    fetched = queue.Queue(maxsize=max(1, prefetch))
+
+    def fetch_all():
+        for item in items:
+            try:
+                fetched.put((item, fetch(item), None))
+            except Exception as e:
+                fetched.put((item, None, e))
+        fetched.put(_DONE)
+
+    threading.Thread(target=fetch_all, name="batch-fetch", daemon=True).start()
+
+    while True:
+        entry = fetched.get()
+        if entry is _DONE:
+            return
+        item, value, error = entry
+        if error is not None:
+            yield item, None, error
+            continue
+        try:
+            yield item, process(item, value), None
+        except Exception as e:
+            yield item, None, e
@@ -0,0 +1,43 @@
+import os
+import threading
+
+# Helpers shared by the on-disk caches (transcripts, window summaries, embeddings):
+# every entry is one file, written through a per-thread temporary name so concurrent
+# jobs storing the same key never collide, and each cache directory is kept under a
+# size budget by removing the least recently used files.
+
+def temp_path(path):
+    """A temporary name next to `path` that is unique to this process and thread."""
+    return f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+
+def touch(path):
+    """Marks a cache file as recently used (LRU order follows mtime)."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+def prune(directory, max_mb):
+    """Removes least recently used files until `directory` fits in max_mb (0 = no limit)."""
+    if max_mb <= 0 or not os.path.isdir(directory):
+        return
+    entries = []
+    for entry in os.scandir(directory):
+        if ".tmp." in entry.name or not entry.is_file():
+            continue
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, entry.path, stat.st_size))
+
+    total = sum(size for _, _, size in entries)
+    budget = max_mb * 1024 * 1024
+    for _, path, size in sorted(entries):
+        if total <= budget:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
@@ -5,6 +5,9 @@ import yt_dlp
 DOWNLOAD_FOLDER = "downloads"
 os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
 
+# Summary cuts never need more than this
+MAX_VIDEO_HEIGHT = int(os.environ.get("MAX_VIDEO_HEIGHT", "720"))
+
 def download_progress_hook(d):
     """Displays real-time download progress."""
     if d['status'] == 'downloading':
@@ -12,37 +15,99 @@ def download_progress_hook(d):
     elif d['status'] == 'finished':
         print("\nDownload complete. Processing video...")
 
-def download_youtube_video(video_url: str):
-    """Downloads a YouTube video quickly and saves it as 'video.mp4'."""
-    try:
-        clean_url = video_url.split("&")[0].strip()  # Remove unnecessary parameters
+def build_download_options(output_dir, mode="video", max_height=MAX_VIDEO_HEIGHT):
+    """Returns (yt-dlp options, output path) for a download mode.
+
+    "video" fetches video capped at max_height merged with the best audio into mp4.
+    "audio" fetches the audio stream only and converts it straight to 16 kHz mono WAV.
+    """
+    common_opts = {
+        'noplaylist': True,  # Download only the video, not a playlist
+        'concurrent_fragment_downloads': 10,  # Parallel downloads for speed
+        'fragment_retries': 10,  # Retry on fragment failures
+        'retries': 5,  # Retry failed downloads
+        'socket_timeout': 20,  # Prevent timeouts
+        'progress_hooks': [download_progress_hook],  # Show progress
+    }
 
-        ydl_opts = {
-            'format': 'bv*+ba/b',  # Best video + best audio
-            'outtmpl': os.path.join(DOWNLOAD_FOLDER, 'video.mp4'),  # Always save as 'video.mp4'
-            'noplaylist': True,  # Download only the video, not a playlist
-            'merge_output_format': 'mp4',  # Ensure MP4 output
-            'concurrent-fragments': 10,  # Parallel downloads for speed
-            'fragment-retries': 10,  # Retry on fragment failures
-            'retries': 5,  # Retry failed downloads
-            'socket_timeout': 20,  # Prevent timeouts
-            'progress_hooks': [download_progress_hook],  # Show progress
+    if mode == "audio":
+        ydl_opts = dict(common_opts, **{
+            'format': 'bestaudio/best',  # Audio stream only
+            'outtmpl': os.path.join(output_dir, 'audio.%(ext)s'),
             'postprocessors': [{
-                'key': 'FFmpegVideoConvertor',
-                'preferedformat': 'mp4',
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': 'wav',
             }],
-        }
+            # Whisper-friendly: mono, 16 kHz
+            'postprocessor_args': {'extractaudio': ['-ac', '1', '-ar', '16000']},
+        })
+        return ydl_opts, os.path.join(output_dir, 'audio.wav')
+
+    # Prefer mp4/m4a streams so merging into mp4 is a plain remux
+    ydl_opts = dict(common_opts, **{
+        'format': (
+            f'bv*[height<={max_height}][ext=mp4]+ba[ext=m4a]/'
+            f'bv*[height<={max_height}]+ba/'
+            f'b[height<={max_height}]/b'
+        ),
+        'outtmpl': os.path.join(output_dir, 'video.%(ext)s'),
+        'merge_output_format': 'mp4',  # Ensure MP4 output
+        # Single-file fallbacks skip the merger and may be webm; remux those to mp4 too
+        'postprocessors': [{'key': 'FFmpegVideoRemuxer', 'preferedformat': 'mp4'}],
+    })
+    return ydl_opts, os.path.join(output_dir, 'video.mp4')
+
+def list_playlist(url):
+    """Returns the video URLs of a playlist URL, or [url] if it is a single video."""
+    clean_url = url.strip()
+    ydl_opts = {'extract_flat': 'in_playlist', 'quiet': True, 'skip_download': True}
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(clean_url, download=False)
+
+    entries = info.get('entries') if info else None
+    if entries is None:
+        return [clean_url]
+    urls = []
+    for entry in entries:
+        if not entry:
+            continue  # Unavailable/private videos show up as empty entries
+        entry_url = entry.get('url') or entry.get('webpage_url')
+        if entry_url and not entry_url.startswith('http'):
+            entry_url = f"https://www.youtube.com/watch?v={entry_url}"
+        if not entry_url and entry.get('id'):
+            entry_url = f"https://www.youtube.com/watch?v={entry['id']}"
+        if entry_url:
+            urls.append(entry_url)
+    return urls
+
+def download_youtube_video(video_url: str, output_dir=DOWNLOAD_FOLDER, mode="video", max_height=MAX_VIDEO_HEIGHT):
+    """Downloads a YouTube video quickly into output_dir.
+
+    mode="video" saves 'video.mp4' (capped at max_height); mode="audio" saves only the
+    audio as 'audio.wav' for the text and audio summaries. Returns the saved path.
+    """
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        clean_url = video_url.split("&")[0].strip()  # Remove unnecessary parameters
+
+        ydl_opts, output_path = build_download_options(output_dir, mode, max_height)
 
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            print(f"\nDownloading video from: {clean_url}")
-            ydl.download([clean_url])
+            print(f"\nDownloading {mode} from: {clean_url}")
+            info = ydl.extract_info(clean_url, download=True)
 
-        video_path = os.path.join(DOWNLOAD_FOLDER, 'video.mp4')
-        print(f"\n✅ Download complete! Saved as: {video_path}")
-        return video_path  
+        # Trust the final path yt-dlp reports over the one we expected
+        downloads = (info or {}).get('requested_downloads') or []
+        if downloads and downloads[0].get('filepath'):
+            output_path = downloads[0]['filepath']
+
+        if not os.path.exists(output_path):
+            print(f"❌ Error: Expected download at {output_path} not found.")
+            return None
+
+        print(f"\n✅ Download complete! Saved as: {output_path}")
+        return output_path  
 
     except Exception as e:
         print(f"❌ Error: {e}")
         return None
-
-
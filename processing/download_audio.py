@@ -1,28 +1,36 @@
 import os
-import torch
-from pydub import AudioSegment
-from whisper import load_model
+from .audio_io import ffmpeg_extract_wav, read_wav_memmap, SAMPLE_RATE
+from .transcribe import transcribe
 
-def extract_audio_from_video(video_file):
-    """Extracts and preprocesses audio from a video file quickly."""
+def is_whisper_wav(file_path):
+    """True if file_path is already a 16 kHz mono 16-bit WAV (e.g. an audio-only download)."""
+    try:
+        samples, sample_rate = read_wav_memmap(file_path)
+    except Exception:
+        return False  # Not a WAV we can read directly
+    return sample_rate == SAMPLE_RATE and samples.ndim == 1
+
+def extract_audio_from_video(video_file, output_dir="data"):
+    """Extracts 16 kHz mono audio from a video file, streamed through ffmpeg.
+
+    Memory use is bounded and does not grow with the length of the input.
+    """
     if not video_file or not os.path.exists(video_file):
         print(f"Error: Video file {video_file} not found.")
         return None
     
-    output_audio = "data/extracted_audio.wav"
+    if is_whisper_wav(video_file):
+        print(f"[Step 1] {video_file} is already 16 kHz mono audio, skipping extraction")
+        return video_file
+
+    output_audio = os.path.join(output_dir, "extracted_audio.wav")
     
     # Create directory if it doesn't exist
-    os.makedirs("data", exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
     
     try:
         print(f"[Step 1] Extracting audio from {video_file}")
-        audio = AudioSegment.from_file(video_file)
-
-        # Convert to mono & set frame rate for faster transcription
-        audio = audio.set_channels(1).set_frame_rate(16000)
-
-        # Export as WAV
-        audio.export(output_audio, format="wav")
+        ffmpeg_extract_wav(video_file, output_audio)
         print("[Step 1] Audio extraction successful!")
         
         return output_audio
@@ -30,29 +38,23 @@ def extract_audio_from_video(video_file):
         print(f"Error during audio extraction: {e}")
         return None
 
-def transcribe_audio(audio_path):
-    """Transcribes audio using Whisper with GPU acceleration (if available)."""
+def transcribe_audio(audio_path, output_dir="data"):
+    """Transcribes audio with Whisper (cached per audio hash) and saves the text transcript."""
     if not audio_path or not os.path.exists(audio_path):
         print(f"Error: Audio file {audio_path} not found.")
         return None
     
     try:
-        # Auto-detect GPU
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-
-        # Load the optimized Whisper model
-        model = load_model("tiny", device=device)
-
-        print(f"[Step 2] Transcribing audio: {audio_path} using {device}")
+        print(f"[Step 2] Transcribing audio: {audio_path}")
         
-        # Transcribe with optimizations
-        result = model.transcribe(audio_path, language="en", temperature=0, fp16=True if device == "cuda" else False)
+        # Single shared transcription stage (text + segments), served from cache on re-runs
+        result = transcribe(audio_path)
 
         print("[Step 2] Transcription successful!")
 
         # Save transcript to a text file
         transcript_text = result["text"]
-        transcript_path = "data/transcript.txt"
+        transcript_path = os.path.join(output_dir, "transcript.txt")
         with open(transcript_path, "w", encoding="utf-8") as f:
             f.write(transcript_text)
 
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import numpy as np
+from .models import get_model, inference_backend
+from .disk_cache import temp_path, touch, prune
+
+# Transcript segment embeddings are stored as float16 .npy files keyed by the segment
+# texts and the embedding model, so re-summarizing the same video skips re-encoding.
+EMBEDDING_CACHE_DIR = os.path.join("data", "embeddings")
+EMBEDDING_CACHE_MAX_MB = int(os.environ.get("EMBEDDING_CACHE_MAX_MB", "500"))  # Least recently used entries go first
+
+# Adaptive encode batch size: use up to this share of available memory, assuming
+# roughly EMBED_BYTES_PER_SAMPLE of activations per sentence
+EMBED_MEMORY_FRACTION = 0.25
+EMBED_BYTES_PER_SAMPLE = 2 * 1024 * 1024
+MIN_EMBED_BATCH_SIZE = 8
+MAX_EMBED_BATCH_SIZE = 256
+
+def available_memory_bytes():
+    """MemAvailable from /proc/meminfo (Linux), or None if unknown."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def adaptive_batch_size(count):
+    """Picks an encode batch size from available memory, capped at the number of inputs."""
+    available = available_memory_bytes()
+    if available is None:
+        batch_size = MIN_EMBED_BATCH_SIZE
+    else:
+        batch_size = int(available * EMBED_MEMORY_FRACTION // EMBED_BYTES_PER_SAMPLE)
+    batch_size = max(MIN_EMBED_BATCH_SIZE, min(MAX_EMBED_BATCH_SIZE, batch_size))
+    return max(1, min(batch_size, count))
+
+def encode(texts, model_name):
+    """Encodes texts into unit-length float32 embeddings with an adaptive batch size."""
+    model = get_model("sentence-transformer", model_name)
+    return model.encode(texts, batch_size=adaptive_batch_size(len(texts)), convert_to_numpy=True, normalize_embeddings=True)
+
+def transcript_hash(texts):
+    """Hashes the ordered list of segment texts."""
+    return hashlib.sha256(json.dumps(texts).encode("utf-8")).hexdigest()
+
+def _cache_path(texts, model_name):
+    if inference_backend() != "fp32":
+        model_name = f"{model_name}@{inference_backend()}"  # Quantized embeddings are cached separately
+    key = hashlib.sha256(f"{model_name}\0{transcript_hash(texts)}".encode("utf-8")).hexdigest()
+    return os.path.join(EMBEDDING_CACHE_DIR, f"{key}.npy")
+
+def load_cached_embeddings(texts, model_name):
+    """Returns cached float32 embeddings for texts, or None."""
+    path = _cache_path(texts, model_name)
+    if not os.path.exists(path):
+        return None
+    try:
+        cached = np.load(path, mmap_mode="r")
+        if cached.shape[0] == len(texts):
+            touch(path)
+            return np.asarray(cached, dtype=np.float32)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable embedding cache {path}: {e}")
+    return None
+
+def save_cached_embeddings(texts, model_name, embeddings):
+    """Stores embeddings for texts as float16; a failed write is logged, not raised."""
+    path = _cache_path(texts, model_name)
+    tmp_path = temp_path(path)
+    try:
+        os.makedirs(EMBEDDING_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "wb") as f:  # A file object keeps np.save from appending ".npy"
+            np.save(f, np.asarray(embeddings).astype(np.float16))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Could not cache embeddings {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+    prune(EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_MAX_MB)
+
+def encode_cached(texts, model_name):
+    """Like encode(), but loads/stores the result in the on-disk embedding cache."""
+    cached = load_cached_embeddings(texts, model_name)
+    if cached is not None:
+        print(f"🔹 Loaded {len(texts)} cached segment embeddings")
+        return cached
+
+    embeddings = encode(texts, model_name)
+    save_cached_embeddings(texts, model_name, embeddings)
+    return embeddings
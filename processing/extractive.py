@@ -0,0 +1,104 @@
+import json
+import os
+import numpy as np
+from .download_audio import extract_audio_from_video
+from .transcribe import transcribe
+from .embeddings import encode_cached
+from .timestamps import EMBEDDING_MODEL, transcribe_and_embed
+from .streaming import STREAMING_PIPELINE
+from .jobs import report_stage
+from .metrics import record_input_audio
+
+# Extractive summaries pick transcript segments instead of generating text: each
+# Whisper segment is scored by its similarity to the centroid of all segment
+# embeddings, and segments are taken best-first unless they are too similar to one
+# already chosen. The chosen segments keep their own timestamps, so there is no
+# generation step and no re-matching of summary sentences.
+EXTRACTIVE_RATIO = float(os.environ.get("EXTRACTIVE_RATIO", "0.2"))  # Share of segments kept
+EXTRACTIVE_MIN_SEGMENTS = 3
+EXTRACTIVE_MAX_SEGMENTS = int(os.environ.get("EXTRACTIVE_MAX_SEGMENTS", "40"))
+REDUNDANCY_THRESHOLD = float(os.environ.get("REDUNDANCY_THRESHOLD", "0.8"))  # Cosine above which a segment repeats a chosen one
+
+def select_segments(embeddings, count, redundancy_threshold=REDUNDANCY_THRESHOLD):
+    """Returns (indices in timeline order, centrality scores) of up to `count` segments.
+
+    `embeddings` are unit-length rows. Centrality is the cosine to the normalized
+    centroid; candidates are skipped when they are within `redundancy_threshold` of a
+    segment already selected.
+    """
+    centroid = embeddings.mean(axis=0)
+    norm = np.linalg.norm(centroid)
+    centrality = embeddings @ (centroid / norm) if norm else np.zeros(len(embeddings))
+
+    selected = []
+    for index in np.argsort(-centrality, kind="stable"):
+        if len(selected) >= count:
+            break
+        if selected and np.max(embeddings[selected] @ embeddings[index]) > redundancy_threshold:
+            continue
+        selected.append(int(index))
+    return sorted(selected), centrality
+
+def extractive_summary(segments, segment_embeddings=None, ratio=EXTRACTIVE_RATIO):
+    """Picks the central, non-redundant segments of a transcript.
+
+    Returns matches in the same shape as timestamps.get_matching_timestamps().
+    """
+    segments = [segment for segment in segments if segment.get("text", "").strip()]
+    texts = [segment["text"].strip() for segment in segments]
+    if not texts:
+        return []
+    if segment_embeddings is None or len(segment_embeddings) != len(texts):
+        segment_embeddings = encode_cached(texts, EMBEDDING_MODEL)
+
+    count = min(len(texts), max(EXTRACTIVE_MIN_SEGMENTS, min(EXTRACTIVE_MAX_SEGMENTS, round(len(texts) * ratio))))
+    selected, centrality = select_segments(np.asarray(segment_embeddings, dtype=np.float32), count)
+    return [
+        {
+            "start_time": segments[i]["start"],
+            "end_time": segments[i]["end"],
+            "matched_sentence": texts[i],
+            "similarity_score": round(float(centrality[i]), 4),
+        }
+        for i in selected
+    ]
+
+def _format_time(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+def summarizeExtractive(video, work_dir="data", streaming=STREAMING_PIPELINE):
+    """Writes a timestamped extractive summary to work_dir and returns its path."""
+    if not video or not os.path.exists(video):
+        raise FileNotFoundError("❌ Invalid or missing video file.")
+
+    report_stage("extract")
+    wav_file = extract_audio_from_video(video, work_dir)
+    if not wav_file or not os.path.exists(wav_file):
+        raise FileNotFoundError("❌ Failed to extract audio.")
+    record_input_audio(wav_file)
+
+    report_stage("transcribe")
+    segment_embeddings = None
+    if streaming:
+        transcript, segment_embeddings = transcribe_and_embed(wav_file)
+    else:
+        transcript = transcribe(wav_file)
+
+    report_stage("summarize")
+    matches = extractive_summary(transcript.get("segments", []), segment_embeddings)
+    print(f"🔹 Selected {len(matches)} of {len(transcript.get('segments', []))} segments")
+
+    with open(os.path.join(work_dir, "timestamps.json"), "w") as f:
+        json.dump({"matches": matches}, f, indent=2)
+
+    summary_file = os.path.join(work_dir, "extractive_summary.txt")
+    with open(summary_file, "w", encoding="utf-8") as f:
+        if matches:
+            f.write("\n".join(f"[{_format_time(match['start_time'])}] {match['matched_sentence']}" for match in matches))
+        else:
+            f.write("⚠️ Transcript is empty. No summary generated.")
+
+    print(f"✅ Extractive summary saved to: {summary_file}")
+    return summary_file
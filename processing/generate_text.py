@@ -1,9 +1,10 @@
-import whisper
+from processing.models import get_model, inference_lock
 
 def transcribe_audio(audio_path):
     """Convert audio to text using OpenAI Whisper."""
-    model = whisper.load_model("base")
-    result = model.transcribe(audio_path)
+    model = get_model("whisper", "base")
+    with inference_lock("whisper", "base"):
+        result = model.transcribe(audio_path)
     return result["text"]
 
 if __name__ == "__main__":
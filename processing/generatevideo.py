@@ -1,34 +1,105 @@
+import bisect
 import json
 import os
 import yt_dlp as ytdl
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
-def extract_clip(video_path, start_time, duration, clip_filename):
-    """Extract video clip based on timestamps."""
+# Clip extraction modes:
+#   "copy"     - stream-copy every clip, with starts snapped back to the previous keyframe
+#                (falls back to "accurate" when a start is too far from a keyframe)
+#   "accurate" - re-encode every clip at the exact timestamps
+CLIP_MODE = os.environ.get("CLIP_MODE", "copy")
+KEYFRAME_SNAP_TOLERANCE = float(os.environ.get("KEYFRAME_SNAP_TOLERANCE", "3.0"))  # Seconds
+# Put the mp4 index (moov atom) at the front so playback starts before the download ends
+FASTSTART = os.environ.get("FASTSTART", "1") == "1"
+# Number of ffmpeg processes run at once when cutting clips
+CLIP_WORKERS = int(os.environ.get("CLIP_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+# Progressive output: when the clips have to be re-encoded, a low-resolution preview is
+# rendered first with the fastest x264 preset so playback can start before the
+# full-quality render is done
+PROGRESSIVE_VIDEO = os.environ.get("PROGRESSIVE_VIDEO", "1") == "1"
+PREVIEW_HEIGHT = int(os.environ.get("PREVIEW_HEIGHT", "360"))
+
+def probe_keyframes(video_path):
+    """Returns the sorted keyframe times (seconds) of the first video stream.
+
+    Reads packet flags only, so nothing is decoded.
+    """
     command = [
-        'ffmpeg', '-i', video_path, '-ss', str(start_time), '-t', str(duration),
-        '-c:v', 'libx264', '-preset', 'fast', '-crf', '23',
-        '-c:a', 'aac', '-b:a', '192k', '-strict', 'experimental',
+        'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+        '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0',
+        video_path
+    ]
+    process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if process.returncode != 0:
+        print(f"❌ FFprobe error: {process.stderr.decode()}")
+        return []
+
+    keyframes = []
+    for line in process.stdout.decode().splitlines():
+        pts_time, _, flags = line.partition(',')
+        if 'K' in flags and pts_time not in ('', 'N/A'):
+            keyframes.append(float(pts_time))
+    keyframes.sort()
+    return keyframes
+
+def snap_to_keyframe(start_time, keyframes, tolerance=KEYFRAME_SNAP_TOLERANCE):
+    """Returns the last keyframe at or before start_time, or None if it is further than tolerance."""
+    index = bisect.bisect_right(keyframes, start_time) - 1
+    if index < 0 or start_time - keyframes[index] > tolerance:
+        return None
+    return keyframes[index]
+
+def extract_clip(video_path, start_time, duration, clip_filename, copy=False, threads=0, preview_height=None):
+    """Extract video clip based on timestamps.
+
+    Seeks on the input side so ffmpeg jumps straight to the clip instead of decoding
+    from the start of the file. With copy=True the streams are copied without
+    re-encoding; start_time should then be a keyframe. With preview_height the clip is
+    scaled down and encoded as fast as possible. Returns True on success.
+    """
+    command = ['ffmpeg', '-ss', str(start_time), '-i', video_path, '-t', str(duration)]
+    if copy:
+        command += ['-c', 'copy', '-avoid_negative_ts', 'make_zero']
+    elif preview_height:
+        command += [
+            '-vf', f'scale=-2:{preview_height}',
+            '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '30',
+            '-c:a', 'aac', '-b:a', '96k',
+            '-threads', str(threads),
+        ]
+    else:
+        command += [
+            '-c:v', 'libx264', '-preset', 'fast', '-crf', '23',
+            '-c:a', 'aac', '-b:a', '192k', '-strict', 'experimental',
+            '-threads', str(threads),
+        ]
+    command += [
         '-y',  # Overwrite existing file if needed
         clip_filename
     ]
     process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     if process.returncode != 0:
         print(f"❌ FFmpeg error: {process.stderr.decode()}")
-    else:
-        print(f"✅ Clip saved: {clip_filename}")
+        return False
+    print(f"✅ Clip saved: {clip_filename}")
+    return True
+
+def combine_clips(clip_filenames, output_filename, work_dir="data", faststart=FASTSTART):
+    """Combine clips into one with the concat demuxer, copying streams (no second encode).
 
-def combine_clips(clip_filenames, output_filename):
-    """Combine multiple video clips into one using concat demuxer."""
+    All clips must share codec parameters, which holds because they are either all
+    stream-copied from the same source or all encoded with the same settings.
+    """
     if not clip_filenames:
         print("❌ No clips to combine.")
-        return
+        return False
 
-    # Ensure `data/` directory exists
-    if not os.path.exists("data"):
-        os.makedirs("data")
+    # Ensure the work directory exists
+    os.makedirs(work_dir, exist_ok=True)
 
-    list_file = os.path.join("data", "clip_list.txt")  # Fixed path
+    list_file = os.path.join(work_dir, "clip_list.txt")
 
     # Write absolute paths to avoid FFmpeg issues
     with open(list_file, "w") as f:
@@ -38,47 +109,131 @@ def combine_clips(clip_filenames, output_filename):
                 f.write(f"file '{clip_path}'\n")
             else:
                 print(f"❌ Missing clip: {clip_path}")
-                return  
+                return False
 
     command = [
         "ffmpeg", "-f", "concat", "-safe", "0", "-i", list_file,
-        "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-        "-c:a", "aac", "-b:a", "192k", "-strict", "experimental",
+        "-c", "copy",
+    ]
+    if faststart:
+        command += ["-movflags", "+faststart"]
+    command += [
         "-y",  # Overwrite existing file
         output_filename
     ]
 
     process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    os.remove(list_file)  # Cleanup
     if process.returncode != 0:
         print(f"❌ FFmpeg error while combining: {process.stderr.decode()}")
-    else:
-        print(f"✅ Combined video saved as {output_filename}")
+        return False
+    print(f"✅ Combined video saved as {output_filename}")
+    return True
 
-    os.remove(list_file)  # Cleanup
+def plan_clips(video_path, timestamps, mode=CLIP_MODE):
+    """Turns timestamps into (start, duration) cuts and decides whether they can be stream-copied.
 
-def generate_summarized_video(video, timestamps, output_video_filename="output_video.mp4"):
-    """Create summarized video using extracted clips."""
-    video_path = os.path.join(video)  # Fixed path
+    Returns (cuts, copy). In "copy" mode every start is moved back to its keyframe, and
+    the end is kept where it was, and a cut whose snapped start falls inside the
+    previous cut is merged into it; if any start cannot be snapped the whole plan is
+    re-encoded so the clips stay concat-compatible.
+    """
+    cuts = []
+    for timestamp in timestamps:
+        try:
+            start_time = float(timestamp['start_time'])
+            end_time = float(timestamp['end_time'])
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"❌ Error processing timestamp {timestamp}: {e}")
+            continue
+        if end_time > start_time:
+            cuts.append((start_time, end_time))
+
+    if mode == "copy":
+        keyframes = probe_keyframes(video_path)
+        snapped = [snap_to_keyframe(start, keyframes) for start, _ in cuts]
+        if cuts and all(start is not None for start in snapped):
+            merged = []
+            for start, (_, end) in zip(snapped, cuts):
+                if merged and start < merged[-1][1]:
+                    # Snapping back reached into the previous cut; join them so no footage repeats
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+                else:
+                    merged.append((start, end))
+            return [(start, end - start) for start, end in merged], True
+        print("⚠️ Clip starts are too far from keyframes; re-encoding clips instead.")
+
+    return [(start, end - start) for start, end in cuts], False
+
+def extract_clips(video_path, cuts, work_dir, copy, workers=CLIP_WORKERS, preview_height=None):
+    """Extracts all cuts with at most `workers` ffmpeg processes running at once.
+
+    Returns (clip filenames in timeline order, whether every clip succeeded).
+    """
+    prefix = "preview_clip" if preview_height else "clip"
+    clip_filenames = [os.path.join(work_dir, f"{prefix}_{i}.mp4") for i in range(len(cuts))]
+    workers = max(1, min(workers, len(cuts)))
+    threads = max(1, (os.cpu_count() or 1) // workers)  # Split cores between encoders
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(
+            lambda args: extract_clip(video_path, args[0][0], args[0][1], args[1], copy=copy, threads=threads, preview_height=preview_height),
+            zip(cuts, clip_filenames),
+        ))
 
-    clip_filenames = []
-    if not os.path.exists("data"):
-        os.makedirs("data")
+    return clip_filenames, all(results)
 
-    for i, timestamp in enumerate(timestamps):
+def _remove_files(filenames):
+    for filename in filenames:
+        if os.path.exists(filename):
+            os.remove(filename)
+
+def render_preview(video_path, cuts, output_video_filename, work_dir="data", height=PREVIEW_HEIGHT):
+    """Renders a low-resolution preview of the cuts next to the output; returns its path or None."""
+    preview_filename = os.path.join(os.path.dirname(output_video_filename), "preview_" + os.path.basename(output_video_filename))
+    print(f"⚡ Rendering {height}p preview...")
+    clip_filenames, ok = extract_clips(video_path, cuts, work_dir, copy=False, preview_height=height)
+    ok = ok and combine_clips(clip_filenames, preview_filename, work_dir, faststart=True)
+    _remove_files(clip_filenames)
+    return preview_filename if ok else None
+
+def _publish_preview(video_path, cuts, output_video_filename, work_dir, on_preview):
+    preview_filename = render_preview(video_path, cuts, output_video_filename, work_dir)
+    if preview_filename:
         try:
-            start_time = timestamp['start_time']
-            end_time = timestamp['end_time']
-            duration = end_time - start_time
-            clip_filename = os.path.join("data", f"clip_{i}.mp4")  # Fixed path
-            extract_clip(video_path, start_time, duration, clip_filename)
-            clip_filenames.append(clip_filename)
+            on_preview(preview_filename)
         except Exception as e:
-            print(f"❌ Error processing timestamp {timestamp}: {e}")
+            print(f"⚠️ Could not publish preview: {e}")  # The full render still goes ahead
+
+def generate_summarized_video(video, timestamps, output_video_filename="output_video.mp4", work_dir="data", mode=CLIP_MODE, faststart=FASTSTART, on_preview=None, progressive=PROGRESSIVE_VIDEO):
+    """Create summarized video using extracted clips written to work_dir.
+
+    With `on_preview` and progressive output, a re-encoded render is preceded by a
+    low-resolution preview that is passed to on_preview(path) as soon as it exists.
+    Stream-copied renders are fast enough to skip it.
+    """
+    video_path = os.path.join(video)  # Fixed path
+    os.makedirs(work_dir, exist_ok=True)
+    preview = on_preview if progressive else None
+
+    cuts, copy = plan_clips(video_path, timestamps, mode)
+    if preview and not copy:
+        _publish_preview(video_path, cuts, output_video_filename, work_dir, preview)
+    print(f"✂️ Cutting {len(cuts)} clips ({'stream copy' if copy else 're-encode'})...")
+
+    clip_filenames, ok = extract_clips(video_path, cuts, work_dir, copy)
+    if not ok and copy:
+        print("⚠️ Stream copy failed; re-encoding clips instead.")
+        _remove_files(clip_filenames)
+        cuts, _ = plan_clips(video_path, timestamps, "accurate")
+        if preview:
+            _publish_preview(video_path, cuts, output_video_filename, work_dir, preview)
+        clip_filenames, ok = extract_clips(video_path, cuts, work_dir, copy=False)
 
-    combine_clips(clip_filenames, output_video_filename)
+    if ok:
+        combine_clips(clip_filenames, output_video_filename, work_dir, faststart)
 
-    for clip_filename in clip_filenames:
-        os.remove(clip_filename)
-    os.remove(video_path)
+    # Clips are temporary; the source video is left to the caller's workspace cleanup
+    _remove_files(clip_filenames)
     print(f"✅ Summarized video created: {output_video_filename}")
     return output_video_filename
@@ -0,0 +1,162 @@
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from .metrics import start_trace, enter_stage, finish_trace
+
+# Background job queue: /process enqueues a pipeline run and returns a job ID straight
+# away, and a fixed pool of worker threads runs the jobs.
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", "16"))
+JOB_HISTORY_SECONDS = int(os.environ.get("JOB_HISTORY_SECONDS", "3600"))  # Keep finished jobs this long
+
+# Pipeline stages reported to clients, in order
+STAGES = ["download", "extract", "transcribe", "summarize", "align", "encode"]
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at JOB_QUEUE_SIZE."""
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+_queue = queue.Queue(maxsize=JOB_QUEUE_SIZE)
+_workers = []
+_workers_lock = threading.Lock()
+_current = threading.local()
+
+def _now():
+    return time.time()
+
+def _update(job_id, **fields):
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is not None:
+            job.update(fields)
+            job["updated_at"] = _now()
+
+def report_stage(stage):
+    """Marks the job running on this thread as having entered `stage`.
+
+    Safe to call outside a job (e.g. from the CLI); it does nothing there.
+    """
+    job_id = getattr(_current, "job_id", None)
+    if job_id is None:
+        return
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return
+        now = _now()
+        previous = job["stage"]
+        if previous and previous in job["stages"]:
+            job["stages"][previous]["finished_at"] = now
+        job["stages"][stage] = {"started_at": now, "finished_at": None}
+        job["stage"] = stage
+        job["updated_at"] = now
+    enter_stage(stage)
+    print(f"🔸 Job {job_id}: {stage}")
+
+def report_progress(done, total):
+    """Records how many items of a multi-item (batch) job are finished; no-op outside a job."""
+    job_id = getattr(_current, "job_id", None)
+    if job_id is not None:
+        _update(job_id, progress={"done": done, "total": total})
+
+def report_preview(result):
+    """Publishes an early, lower-quality result (e.g. a preview artifact ID) for the job on this thread."""
+    job_id = getattr(_current, "job_id", None)
+    if job_id is not None:
+        _update(job_id, preview=result)
+
+def _run(job_id, kind, func, args, kwargs):
+    _current.job_id = job_id
+    start_trace(job_id, kind)
+    _update(job_id, status="running", started_at=_now())
+    status = "failed"
+    try:
+        result = func(*args, **kwargs)
+        with _jobs_lock:
+            job = _jobs[job_id]
+            if job["stage"] in job["stages"]:
+                job["stages"][job["stage"]]["finished_at"] = _now()
+        _update(job_id, status="done", result=result, finished_at=_now())
+        status = "done"
+    except Exception as e:
+        traceback.print_exc()
+        _update(job_id, status="failed", error=str(e), finished_at=_now())
+    finally:
+        finish_trace(status)
+        _current.job_id = None
+
+def _worker_loop():
+    while True:
+        job_id, kind, func, args, kwargs = _queue.get()
+        try:
+            _run(job_id, kind, func, args, kwargs)
+        finally:
+            _queue.task_done()
+
+def start_workers(count=None):
+    """Starts the worker pool once; later calls are no-ops."""
+    with _workers_lock:
+        if _workers:
+            return
+        for i in range(count or JOB_WORKERS):
+            worker = threading.Thread(target=_worker_loop, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            _workers.append(worker)
+
+def _prune_finished():
+    cutoff = _now() - JOB_HISTORY_SECONDS
+    with _jobs_lock:
+        for job_id in [j for j, job in _jobs.items() if job["status"] in ("done", "failed") and job["finished_at"] < cutoff]:
+            del _jobs[job_id]
+
+def submit_job(kind, func, *args, **kwargs):
+    """Queues `func(*args, **kwargs)` and returns the new job ID.
+
+    Raises QueueFullError if JOB_QUEUE_SIZE jobs are already waiting.
+    """
+    start_workers()
+    _prune_finished()
+
+    job_id = uuid.uuid4().hex
+    now = _now()
+    with _jobs_lock:
+        _jobs[job_id] = {
+            "id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "stage": None,
+            "stages": {},
+            "progress": None,
+            "preview": None,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "started_at": None,
+            "finished_at": None,
+        }
+    try:
+        _queue.put_nowait((job_id, kind, func, args, kwargs))
+    except queue.Full:
+        with _jobs_lock:
+            del _jobs[job_id]
+        raise QueueFullError(f"Job queue is full ({JOB_QUEUE_SIZE} waiting)")
+    return job_id
+
+def get_job(job_id):
+    """Returns a snapshot of a job record, or None if unknown."""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return None
+        snapshot = dict(job)
+        snapshot["stages"] = {name: dict(info) for name, info in job["stages"].items()}
+        return snapshot
+
+def queue_depth():
+    """Number of jobs waiting for a worker."""
+    return _queue.qsize()
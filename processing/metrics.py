@@ -0,0 +1,198 @@
+import json
+import os
+import threading
+import time
+from .audio_io import read_wav_memmap
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is then reported as 0
+    resource = None
+
+# Per-stage instrumentation: every job keeps a trace of timed spans, one per pipeline
+# stage (download = yt-dlp, extract = ffmpeg, transcribe = Whisper, summarize =
+# BART/T5, align = MiniLM, encode = ffmpeg). Spans open and close on report_stage()
+# transitions, so the pipelines need no extra calls. Finished traces are written as
+# JSON to TRACE_DIR and folded into the totals rendered by render_prometheus().
+TRACE_DIR = os.environ.get("TRACE_DIR", os.path.join("data", "traces"))
+TRACE_KEEP = int(os.environ.get("TRACE_KEEP", "500"))  # Newest trace files kept on disk
+
+METRIC_PREFIX = "videosummary"
+
+_lock = threading.Lock()
+_stage_totals = {}  # (pipeline, stage) -> {"count", "seconds", "max_seconds"}
+_job_totals = {}  # (pipeline, status) -> count
+_realtime = {}  # pipeline -> {"count", "input_seconds", "wall_seconds"}
+_current = threading.local()
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def _peak_rss_bytes():
+    """High-water mark of this process's resident set (ru_maxrss is in KiB on Linux), or 0 if unavailable."""
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def start_trace(job_id, pipeline):
+    """Starts the trace for the job running on this thread."""
+    _current.trace = {
+        "job_id": job_id,
+        "pipeline": pipeline,
+        "started_at": time.time(),
+        "input_seconds": None,
+        "spans": [],
+    }
+    _current.span_start = None
+
+def _close_span():
+    trace = getattr(_current, "trace", None)
+    if trace is None or _current.span_start is None:
+        return
+    span = trace["spans"][-1]
+    span["seconds"] = round(time.perf_counter() - _current.span_start, 4)
+    span["rss_bytes"] = _rss_bytes()
+    span["peak_rss_bytes"] = _peak_rss_bytes()
+    _current.span_start = None
+
+    with _lock:
+        totals = _stage_totals.setdefault((trace["pipeline"], span["stage"]), {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+        totals["count"] += 1
+        totals["seconds"] += span["seconds"]
+        totals["max_seconds"] = max(totals["max_seconds"], span["seconds"])
+
+def enter_stage(stage):
+    """Closes the current span (if any) and opens one for `stage`; no-op outside a trace."""
+    trace = getattr(_current, "trace", None)
+    if trace is None:
+        return
+    _close_span()
+    trace["spans"].append({"stage": stage, "started_at": time.time(), "rss_bytes_at_start": _rss_bytes()})
+    _current.span_start = time.perf_counter()
+
+def record_input_audio(wav_path):
+    """Adds the duration of an input audio file to the job's total, used for the real-time factor.
+
+    Batch jobs summarize several inputs under one trace, so each call accumulates.
+    """
+    trace = getattr(_current, "trace", None)
+    if trace is None:
+        return
+    try:
+        samples, sample_rate = read_wav_memmap(wav_path)
+        trace["input_seconds"] = round((trace["input_seconds"] or 0) + len(samples) / sample_rate, 3)
+    except Exception as e:
+        print(f"⚠️ Could not read input duration from {wav_path}: {e}")
+
+def finish_trace(status):
+    """Closes the last span, writes the trace to TRACE_DIR and updates the totals."""
+    trace = getattr(_current, "trace", None)
+    if trace is None:
+        return None
+    _close_span()
+    _current.trace = None
+
+    trace["status"] = status
+    trace["finished_at"] = time.time()
+    trace["wall_seconds"] = round(trace["finished_at"] - trace["started_at"], 4)
+    trace["peak_rss_bytes"] = _peak_rss_bytes()
+    # Processing time per second of input; below 1.0 is faster than real time
+    trace["realtime_factor"] = round(trace["wall_seconds"] / trace["input_seconds"], 4) if trace["input_seconds"] else None
+
+    with _lock:
+        key = (trace["pipeline"], status)
+        _job_totals[key] = _job_totals.get(key, 0) + 1
+        if status == "done" and trace["input_seconds"]:
+            realtime = _realtime.setdefault(trace["pipeline"], {"count": 0, "input_seconds": 0.0, "wall_seconds": 0.0})
+            realtime["count"] += 1
+            realtime["input_seconds"] += trace["input_seconds"]
+            realtime["wall_seconds"] += trace["wall_seconds"]
+
+    try:
+        _write_trace(trace)
+    except OSError as e:
+        print(f"⚠️ Could not write trace for job {trace['job_id']}: {e}")
+    return trace
+
+def _trace_path(job_id):
+    return os.path.join(TRACE_DIR, f"{job_id}.json")
+
+def _write_trace(trace):
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    path = _trace_path(trace["job_id"])
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(trace, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+    traces = sorted((entry for entry in os.scandir(TRACE_DIR) if entry.name.endswith(".json")), key=lambda entry: entry.stat().st_mtime)
+    for entry in traces[:max(0, len(traces) - TRACE_KEEP)]:
+        os.remove(entry.path)
+
+def load_trace(job_id):
+    """Returns the written trace for a finished job, or None."""
+    if not job_id.isalnum():
+        return None
+    try:
+        with open(_trace_path(job_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels.items()) + "}"
+
+def render_prometheus(gauges=None, counters=None):
+    """Renders the totals in the Prometheus text exposition format.
+
+    `gauges` and `counters` map extra metric names (without prefix) to values, so
+    callers can add state owned by other modules (queue depth, cache counters).
+    """
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+        for suffix, labels, value in samples:
+            lines.append(f"{METRIC_PREFIX}_{name}{suffix}{labels} {value}")
+
+    with _lock:
+        stage_totals = {key: dict(value) for key, value in _stage_totals.items()}
+        job_totals = dict(_job_totals)
+        realtime = {key: dict(value) for key, value in _realtime.items()}
+
+    metric("stage_seconds", "summary", "Time spent in each pipeline stage.", [
+        (suffix, _labels(pipeline=pipeline, stage=stage), value)
+        for (pipeline, stage), totals in sorted(stage_totals.items())
+        for suffix, value in (("_sum", round(totals["seconds"], 4)), ("_count", totals["count"]))
+    ])
+    metric("stage_seconds_max", "gauge", "Slowest run of each pipeline stage.", [
+        ("", _labels(pipeline=pipeline, stage=stage), round(totals["max_seconds"], 4))
+        for (pipeline, stage), totals in sorted(stage_totals.items())
+    ])
+    metric("jobs_total", "counter", "Finished jobs by pipeline and status.", [
+        ("", _labels(pipeline=pipeline, status=status), count)
+        for (pipeline, status), count in sorted(job_totals.items())
+    ])
+    metric("input_audio_seconds_total", "counter", "Seconds of input audio processed by successful jobs.", [
+        ("", _labels(pipeline=pipeline), round(totals["input_seconds"], 3)) for pipeline, totals in sorted(realtime.items())
+    ])
+    metric("processing_seconds_total", "counter", "Wall time of successful jobs with a known input duration.", [
+        ("", _labels(pipeline=pipeline), round(totals["wall_seconds"], 3)) for pipeline, totals in sorted(realtime.items())
+    ])
+    metric("realtime_factor", "gauge", "Processing seconds per input second, averaged over successful jobs.", [
+        ("", _labels(pipeline=pipeline), round(totals["wall_seconds"] / totals["input_seconds"], 4))
+        for pipeline, totals in sorted(realtime.items()) if totals["input_seconds"]
+    ])
+    metric("resident_memory_bytes", "gauge", "Current resident set size of the server process.", [("", "", _rss_bytes())])
+    metric("peak_resident_memory_bytes", "gauge", "Peak resident set size of the server process.", [("", "", _peak_rss_bytes())])
+
+    for name, value in sorted((gauges or {}).items()):
+        metric(name, "gauge", name.replace("_", " ").capitalize() + ".", [("", "", value)])
+    for name, value in sorted((counters or {}).items()):
+        metric(name, "counter", name.replace("_", " ").capitalize() + ".", [("", "", value)])
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,233 @@
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Process-wide model registry: every processing module gets its models from here so
+# each model is loaded once, lazily, and shared across requests.
+#
+# Models are addressed by (kind, name), e.g. ("whisper", "tiny") or ("t5", "t5-small").
+# MODEL_MEMORY_BUDGET_MB caps the estimated resident size of all loaded models; the
+# least recently used models are evicted when a new load goes over it (0 = no limit).
+MODEL_MEMORY_BUDGET_MB = int(os.environ.get("MODEL_MEMORY_BUDGET_MB", "0"))
+
+# CPU inference backend for the T5/BART summarizers and the sentence encoder: "fp32"
+# runs them as loaded, "int8" applies dynamic int8 quantization to their Linear layers
+# (CPU only; on CUDA the models stay as they are). GENERATION_MODE=fast replaces beam
+# search with FAST_NUM_BEAMS beams (1 = greedy). Thread counts of 0 keep torch's defaults.
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "fp32")
+GENERATION_MODE = os.environ.get("GENERATION_MODE", "quality")
+FAST_NUM_BEAMS = int(os.environ.get("FAST_NUM_BEAMS", "1"))
+TORCH_INTRA_OP_THREADS = int(os.environ.get("TORCH_INTRA_OP_THREADS", "0"))
+TORCH_INTER_OP_THREADS = int(os.environ.get("TORCH_INTER_OP_THREADS", "0"))
+
+_loaders = {}
+_models = OrderedDict()  # (kind, name) -> {"model", "load_seconds", "size_bytes", "hits"}
+_lock = threading.RLock()
+_load_locks = {}
+_inference_locks = {}  # (kind, name) -> lock for models that are not safe to call concurrently
+
+def _device():
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+_threads_configured = False
+
+def configure_threads():
+    """Applies TORCH_INTRA_OP_THREADS / TORCH_INTER_OP_THREADS once per process."""
+    global _threads_configured
+    if _threads_configured:
+        return
+    _threads_configured = True
+    import torch
+    if TORCH_INTRA_OP_THREADS > 0:
+        torch.set_num_threads(TORCH_INTRA_OP_THREADS)
+    if TORCH_INTER_OP_THREADS > 0:
+        try:
+            torch.set_num_interop_threads(TORCH_INTER_OP_THREADS)
+        except RuntimeError as e:
+            print(f"⚠️ Inter-op threads already fixed: {e}")  # Only settable before any parallel work
+
+def inference_backend():
+    """The backend actually in effect: int8 is only applied on CPU."""
+    if INFERENCE_BACKEND == "int8" and _device() == "cpu":
+        return "int8"
+    return "fp32"
+
+def _quantize(module):
+    if inference_backend() != "int8":
+        return module
+    import torch
+    return torch.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+
+def generation_beams(default):
+    """Beam count for summary generation: `default` normally, FAST_NUM_BEAMS in fast mode."""
+    return FAST_NUM_BEAMS if GENERATION_MODE == "fast" else default
+
+def _load_whisper(name):
+    from whisper import load_model
+    return load_model(name, device=_device())
+
+def _load_t5(name):
+    import torch
+    from transformers import T5Tokenizer, T5ForConditionalGeneration
+    torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32  # Use fp16 if CUDA
+    model = T5ForConditionalGeneration.from_pretrained(name, torch_dtype=torch_dtype).to(_device())
+    model = _quantize(model.eval())
+    tokenizer = T5Tokenizer.from_pretrained(name)
+    return model, tokenizer
+
+def _load_bart(name):
+    from transformers import pipeline, AutoTokenizer
+    summarizer = pipeline("summarization", model=name)
+    summarizer.model = _quantize(summarizer.model)
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    return summarizer, tokenizer
+
+def _load_spacy(name):
+    import spacy
+    return spacy.load(name)
+
+def _load_sentence_transformer(name):
+    from sentence_transformers import SentenceTransformer
+    return _quantize(SentenceTransformer(name))
+
+def register_loader(kind, loader):
+    """Registers a loader callable `loader(name) -> model` for a model kind."""
+    with _lock:
+        _loaders[kind] = loader
+
+register_loader("whisper", _load_whisper)
+register_loader("t5", _load_t5)
+register_loader("bart", _load_bart)
+register_loader("spacy", _load_spacy)
+register_loader("sentence-transformer", _load_sentence_transformer)
+
+def _rss_bytes():
+    """Current resident set size of this process (Linux), or 0 if unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def _parameter_bytes(obj):
+    """Sums torch parameter/buffer sizes reachable from a model, pipeline or tuple of them."""
+    if isinstance(obj, (tuple, list)):
+        return sum(_parameter_bytes(item) for item in obj)
+    module = getattr(obj, "model", obj)  # transformers pipelines wrap the module
+    if not hasattr(module, "parameters"):
+        return 0
+    total = sum(p.numel() * p.element_size() for p in module.parameters())
+    if hasattr(module, "buffers"):
+        total += sum(b.numel() * b.element_size() for b in module.buffers())
+    return total
+
+def _evict_over_budget(keep):
+    budget = MODEL_MEMORY_BUDGET_MB * 1024 * 1024
+    if budget <= 0:
+        return
+    total = sum(entry["size_bytes"] for entry in _models.values())
+    for key in list(_models.keys()):
+        if total <= budget:
+            break
+        if key == keep:
+            continue
+        total -= _models[key]["size_bytes"]
+        _evict_locked(key)
+
+def _evict_locked(key):
+    entry = _models.pop(key, None)
+    if entry is None:
+        return
+    print(f"♻️ Evicting model {key[0]}:{key[1]} ({entry['size_bytes'] / 1e6:.1f} MB)")
+    del entry
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+def get_model(kind, name):
+    """Returns the shared instance of a model, loading it on first use."""
+    key = (kind, name)
+    with _lock:
+        entry = _models.get(key)
+        if entry is not None:
+            _models.move_to_end(key)
+            entry["hits"] += 1
+            return entry["model"]
+        if kind not in _loaders:
+            raise KeyError(f"No loader registered for model kind '{kind}'")
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+
+    # Load outside the registry lock so other models stay available meanwhile;
+    # the per-model lock keeps concurrent requests from loading the same model twice.
+    with load_lock:
+        with _lock:
+            entry = _models.get(key)
+            if entry is not None:
+                _models.move_to_end(key)
+                entry["hits"] += 1
+                return entry["model"]
+
+        configure_threads()
+        print(f"⏳ Loading model {kind}:{name}...")
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        model = _loaders[kind](name)
+        load_seconds = time.perf_counter() - start
+        size_bytes = _parameter_bytes(model) or max(0, _rss_bytes() - rss_before)
+        print(f"✅ Loaded {kind}:{name} in {load_seconds:.2f}s ({size_bytes / 1e6:.1f} MB)")
+
+        with _lock:
+            _models[key] = {"model": model, "load_seconds": load_seconds, "size_bytes": size_bytes, "hits": 0}
+            _evict_over_budget(keep=key)
+        return model
+
+def inference_lock(kind, name):
+    """Returns the lock serializing calls into a shared model instance.
+
+    Whisper's decoder installs kv-cache hooks on the model for the duration of each
+    transcribe() call, so two threads transcribing with the same instance would read
+    each other's cached keys and values. Hold this lock around every such call.
+    """
+    with _lock:
+        return _inference_locks.setdefault((kind, name), threading.Lock())
+
+def evict_model(kind, name):
+    """Drops a model from the registry; callers still holding it keep their reference."""
+    with _lock:
+        _evict_locked((kind, name))
+
+def warm_up(specs):
+    """Loads models ahead of the first request.
+
+    `specs` is an iterable of "kind:name" strings, e.g. ["whisper:tiny", "t5:t5-small"].
+    """
+    for spec in specs:
+        spec = spec.strip()
+        if not spec:
+            continue
+        kind, _, name = spec.partition(":")
+        try:
+            get_model(kind, name)
+        except Exception as e:
+            print(f"⚠️ Warm-up failed for {spec}: {e}")
+
+def model_stats():
+    """Reports load time, estimated resident size and hit count per loaded model."""
+    with _lock:
+        return [
+            {
+                "kind": kind,
+                "name": name,
+                "load_seconds": round(entry["load_seconds"], 3),
+                "size_mb": round(entry["size_bytes"] / 1e6, 1),
+                "hits": entry["hits"],
+            }
+            for (kind, name), entry in _models.items()
+        ]
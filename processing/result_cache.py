@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from urllib.parse import urlparse, parse_qs
+
+# Whole-pipeline result cache: finished outputs are stored by a key built from the
+# normalized input (YouTube video ID or file hash), the summarization type and the
+# model/parameter set, so repeated requests are answered without any processing.
+# The least recently used entries are evicted when the cache grows past
+# RESULT_CACHE_MAX_MB.
+RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR", os.path.join("data", "result_cache"))
+RESULT_CACHE_MAX_MB = int(os.environ.get("RESULT_CACHE_MAX_MB", "2000"))
+
+META_FILE = "meta.json"
+
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+_lock = threading.Lock()
+
+def youtube_video_id(url):
+    """Extracts the video ID from the common YouTube URL forms, or None."""
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or "").lower()
+    if host.endswith("youtu.be"):
+        return parsed.path.lstrip("/").split("/")[0] or None
+    if "youtube" in host:
+        video_id = parse_qs(parsed.query).get("v", [None])[0]
+        if video_id:
+            return video_id
+        parts = [part for part in parsed.path.split("/") if part]
+        if len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+            return parts[1]
+    return None
+
+def source_id_for_url(url):
+    """Normalized source identifier for a URL (the video ID for YouTube links)."""
+    video_id = youtube_video_id(url)
+    if video_id:
+        return f"youtube:{video_id}"
+    return f"url:{url.split('&')[0].strip()}"
+
+def source_id_for_file(file_hash):
+    return f"file:{file_hash}"
+
+def cache_key(source_id, summarization_type, params):
+    """Builds the cache key from the source, summarization type and parameter set."""
+    payload = json.dumps({"source": source_id, "type": summarization_type, "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _entry_dir(key):
+    return os.path.join(RESULT_CACHE_DIR, key)
+
+def lookup(key):
+    """Returns the cached output path for a key (marking it recently used), or None."""
+    entry_dir = _entry_dir(key)
+    meta_path = os.path.join(entry_dir, META_FILE)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        path = os.path.join(entry_dir, meta["file"])
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+    except (OSError, ValueError, KeyError):
+        with _lock:
+            _stats["misses"] += 1
+        return None
+
+    os.utime(entry_dir)  # LRU order follows the entry directory's mtime
+    with _lock:
+        _stats["hits"] += 1
+    print(f"⚡ Result cache hit: {key}")
+    return path
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)  # Shares the data without copying when on the same filesystem
+    except OSError:
+        shutil.copy2(src, dst)
+
+def store(key, output_path, meta=None):
+    """Stores a finished output under key and evicts old entries if over budget."""
+    entry_dir = _entry_dir(key)
+    tmp_dir = f"{entry_dir}.tmp.{os.getpid()}.{threading.get_ident()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    file_name = os.path.basename(output_path)
+    _link_or_copy(output_path, os.path.join(tmp_dir, file_name))
+    with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(dict(meta or {}, file=file_name, stored_at=time.time()), f, indent=2)
+
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    os.replace(tmp_dir, entry_dir)
+    with _lock:
+        _stats["stores"] += 1
+    evict_over_budget()
+
+def materialize(cached_path, target_dir):
+    """Places a cached output into target_dir (hard link when possible) and returns its path."""
+    target = os.path.join(target_dir, os.path.basename(cached_path))
+    _link_or_copy(cached_path, target)
+    return target
+
+def _dir_size(path):
+    total = 0
+    for name in os.listdir(path):
+        try:
+            total += os.path.getsize(os.path.join(path, name))
+        except OSError:
+            pass
+    return total
+
+def evict_over_budget():
+    """Removes least recently used entries until the cache fits RESULT_CACHE_MAX_MB."""
+    if not os.path.isdir(RESULT_CACHE_DIR):
+        return
+    entries = []
+    for name in os.listdir(RESULT_CACHE_DIR):
+        path = os.path.join(RESULT_CACHE_DIR, name)
+        if ".tmp." in name or not os.path.isdir(path):
+            continue
+        entries.append((os.path.getmtime(path), path, _dir_size(path)))
+
+    total = sum(size for _, _, size in entries)
+    budget = RESULT_CACHE_MAX_MB * 1024 * 1024
+    for _, path, size in sorted(entries):
+        if total <= budget:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        with _lock:
+            _stats["evictions"] += 1
+
+def cache_stats():
+    """Hit/miss/store/eviction counters since the process started."""
+    with _lock:
+        return dict(_stats)
@@ -0,0 +1,71 @@
+import math
+import os
+
+# Segment planning between timestamp matching and video generation: matched spans are
+# padded, stretched to a minimum length, merged when they overlap or sit within
+# SEGMENT_GAP_TOLERANCE seconds of each other, and split into equal pieces when longer
+# than the maximum.
+SEGMENT_GAP_TOLERANCE = float(os.environ.get("SEGMENT_GAP_TOLERANCE", "1.0"))  # Seconds
+SEGMENT_MIN_LENGTH = float(os.environ.get("SEGMENT_MIN_LENGTH", "1.0"))
+SEGMENT_MAX_LENGTH = float(os.environ.get("SEGMENT_MAX_LENGTH", "60.0"))
+SEGMENT_PADDING = float(os.environ.get("SEGMENT_PADDING", "0.0"))
+
+def plan_segments(matches, gap_tolerance=SEGMENT_GAP_TOLERANCE, min_length=SEGMENT_MIN_LENGTH,
+                  max_length=SEGMENT_MAX_LENGTH, padding=SEGMENT_PADDING, duration=None):
+    """Turns matched timestamps into a list of cuts.
+
+    `matches` are dicts with "start_time" and "end_time" (seconds), as returned by
+    timestamps.get_matching_timestamps. Returns chronologically sorted dicts with
+    "start_time", "end_time" and "sources" (indices of the matches each cut covers).
+    `duration`, when known, clamps cuts to the end of the media.
+    """
+    spans = []
+    for index, match in enumerate(matches):
+        start = max(0.0, float(match["start_time"]) - padding)
+        end = float(match["end_time"]) + padding
+        if duration is not None:
+            end = min(end, duration)
+        if end <= start:
+            continue
+
+        # Stretch short spans around their centre
+        if end - start < min_length:
+            centre = (start + end) / 2
+            start = max(0.0, centre - min_length / 2)
+            end = start + min_length
+            if duration is not None and end > duration:
+                end = duration
+                start = max(0.0, end - min_length)
+
+        spans.append({"start_time": start, "end_time": end, "sources": [index]})
+
+    spans.sort(key=lambda span: span["start_time"])
+
+    merged = []
+    for span in spans:
+        if merged:
+            last = merged[-1]
+            close = span["start_time"] - last["end_time"] <= gap_tolerance
+            new_end = max(last["end_time"], span["end_time"])
+            if close and new_end - last["start_time"] <= max_length:
+                last["end_time"] = new_end
+                last["sources"].extend(span["sources"])
+                continue
+            if span["start_time"] < last["end_time"]:
+                # Overlaps but would be too long: start where the previous cut ends
+                if span["end_time"] <= last["end_time"]:
+                    last["sources"].extend(span["sources"])
+                    continue
+                span["start_time"] = last["end_time"]
+        merged.append(span)
+
+    plan = []
+    for span in merged:
+        # Split long spans into equal pieces, so no piece is a short leftover tail
+        length = span["end_time"] - span["start_time"]
+        pieces = max(1, math.ceil(length / max_length))
+        for i in range(pieces):
+            start = span["start_time"] + length * i / pieces
+            end = span["end_time"] if i == pieces - 1 else span["start_time"] + length * (i + 1) / pieces
+            plan.append({"start_time": round(start, 3), "end_time": round(end, 3), "sources": span["sources"]})
+    return plan
@@ -0,0 +1,143 @@
+import atexit
+import bisect
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import numpy as np
+from .audio_io import read_wav_memmap, SAMPLE_RATE
+from .models import get_model, configure_threads
+from .summarize_audio import analyze_audio
+
+# Sharded transcription: long audio is cut at silences into shards of roughly
+# SHARD_SECONDS, the shards are transcribed by a pool of TRANSCRIBE_WORKERS processes
+# (each with its own preloaded Whisper model), and the segments are stitched back
+# together with global timestamps. TRANSCRIBE_WORKERS=1 keeps the single-process path.
+# The pool is started on first use and kept for the life of the process, so the
+# workers spawn and load Whisper once rather than on every job.
+TRANSCRIBE_WORKERS = int(os.environ.get("TRANSCRIBE_WORKERS", "1"))
+SHARD_SECONDS = int(os.environ.get("SHARD_SECONDS", "300"))
+
+_worker_model_name = None
+
+_pool = None
+_pool_config = None  # (model_name, workers) the current pool was started with
+_pool_lock = threading.Lock()
+
+def plan_shards(n_samples, non_silent_intervals, shard_samples):
+    """Splits [0, n_samples) into (start, end) shards of about shard_samples each.
+
+    Cuts are placed in the middle of the silence closest to each target length, as
+    long as it lies within half a shard of it; otherwise the cut is made at the target.
+    """
+    cuts = sorted(
+        (int(end) + int(next_start)) // 2
+        for (_, end), (next_start, _) in zip(non_silent_intervals[:-1], non_silent_intervals[1:])
+    )
+
+    shards = []
+    start = 0
+    while n_samples - start > shard_samples * 1.5:
+        target = start + shard_samples
+        low, high = start + shard_samples // 2, start + shard_samples + shard_samples // 2
+        i = bisect.bisect_left(cuts, target)
+        candidates = [cut for cut in cuts[max(0, i - 1):i + 1] if low <= cut <= high]
+        cut = min(candidates, key=lambda c: abs(c - target)) if candidates else target
+        shards.append((start, cut))
+        start = cut
+    shards.append((start, n_samples))
+    return shards
+
+def _init_worker(model_name, threads):
+    """Runs once in each worker process: pins its thread count and loads the model."""
+    global _worker_model_name
+    import torch
+    configure_threads()  # Applied first, so the load in get_model cannot override the split
+    torch.set_num_threads(threads)
+    _worker_model_name = model_name
+    get_model("whisper", model_name)
+
+def _transcribe_shard(audio_path, start, end, options):
+    samples, _ = read_wav_memmap(audio_path)
+    audio = samples[start:end].astype(np.float32) / 32768.0
+    result = get_model("whisper", _worker_model_name).transcribe(audio, **options)
+
+    offset = start / SAMPLE_RATE
+    segments = [
+        {"start": round(offset + segment["start"], 3), "end": round(offset + segment["end"], 3), "text": segment["text"].strip()}
+        for segment in result.get("segments", [])
+    ]
+    return result.get("text", ""), segments
+
+def can_shard(audio_path, workers=TRANSCRIBE_WORKERS, shard_seconds=SHARD_SECONDS):
+    """True when sharding is enabled and the audio is a 16 kHz mono WAV longer than one shard."""
+    if workers <= 1:
+        return False
+    try:
+        samples, sample_rate = read_wav_memmap(audio_path)
+    except Exception:
+        return False
+    return sample_rate == SAMPLE_RATE and samples.ndim == 1 and len(samples) > 1.5 * shard_seconds * SAMPLE_RATE
+
+def _get_pool(model_name, workers):
+    """Returns the shared worker pool, starting it (or restarting it for another model) as needed."""
+    global _pool, _pool_config
+    with _pool_lock:
+        if _pool is not None and _pool_config == (model_name, workers):
+            return _pool
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        threads = max(1, (os.cpu_count() or 1) // workers)  # Split cores between workers
+        print(f"[Transcribe] Starting {workers} shard workers ({threads} threads each)")
+        # Spawned workers avoid inheriting torch/OpenMP state from the server process
+        context = multiprocessing.get_context("spawn")
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                    initializer=_init_worker, initargs=(model_name, threads))
+        _pool_config = (model_name, workers)
+        return _pool
+
+def _discard_pool(pool):
+    global _pool, _pool_config
+    with _pool_lock:
+        if _pool is pool:
+            _pool, _pool_config = None, None
+    pool.shutdown(wait=False)
+
+def shutdown_pool():
+    """Stops the shard workers; the next sharded transcription starts a new pool."""
+    with _pool_lock:
+        pool = _pool
+    if pool is not None:
+        _discard_pool(pool)
+
+atexit.register(shutdown_pool)
+
+def transcribe_sharded(audio_path, model_name, options, workers=TRANSCRIBE_WORKERS, shard_seconds=SHARD_SECONDS):
+    """Transcribes a 16 kHz mono WAV in parallel shards.
+
+    Returns {"text", "segments"} in exactly the format of transcribe.transcribe().
+    """
+    samples, _ = read_wav_memmap(audio_path)
+    _, non_silent_intervals, _ = analyze_audio(audio_path, features=("intervals",))
+    shards = plan_shards(len(samples), non_silent_intervals, shard_seconds * SAMPLE_RATE)
+
+    print(f"[Transcribe] {len(shards)} shards on {workers} workers")
+
+    pool = _get_pool(model_name, workers)
+    try:
+        results = list(pool.map(
+            _transcribe_shard,
+            [audio_path] * len(shards),
+            [start for start, _ in shards],
+            [end for _, end in shards],
+            [options] * len(shards),
+        ))
+    except BrokenProcessPool:
+        _discard_pool(pool)  # A worker died (e.g. OOM); start fresh next time
+        raise
+
+    return {
+        "text": "".join(text for text, _ in results),
+        "segments": [segment for _, segments in results for segment in segments],
+    }
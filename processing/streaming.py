@@ -0,0 +1,45 @@
+import os
+import queue
+import threading
+
+# Streaming pipeline mode: transcription yields finished 30-second windows and the
+# downstream stages (chunk summarization, segment embedding) start on them in a
+# background thread while Whisper keeps going. Torch releases the GIL during
+# inference, so the stages genuinely overlap on multi-core machines.
+STREAMING_PIPELINE = os.environ.get("STREAMING_PIPELINE", "0") == "1"
+
+_DONE = object()
+
+class BackgroundStage:
+    """Applies `func` to submitted items on a background thread, keeping results in order."""
+
+    def __init__(self, func, name="stage"):
+        self._func = func
+        self._queue = queue.Queue()
+        self._results = []
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name=f"stream-{name}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            if self._error is not None:
+                continue  # Drain the queue after a failure
+            try:
+                self._results.append(self._func(item))
+            except Exception as e:
+                self._error = e
+
+    def submit(self, item):
+        self._queue.put(item)
+
+    def finish(self):
+        """Waits for all submitted items and returns their results (re-raising any failure)."""
+        self._queue.put(_DONE)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._results
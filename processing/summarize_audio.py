@@ -1,57 +1,156 @@
-import librosa
+import wave
 import numpy as np
-from pydub import AudioSegment
 from .download_audio import extract_audio_from_video  # Assuming this is for extracting audio from video
+from .audio_io import read_wav_memmap, ffmpeg_load_audio, SAMPLE_RATE
+from .jobs import report_stage
+from .metrics import record_input_audio
 
-# Step 1: Audio Analysis using Librosa
-def analyze_audio(file_path):
-    # Load audio file using librosa
-    y, sr = librosa.load(file_path)
+# Analysis runs over fixed-size blocks of frames at the file's native rate, so memory
+# stays bounded no matter how long the audio is.
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+BLOCK_FRAMES = 4096  # Frames per block (~2 minutes at 16 kHz)
+SILENCE_TOP_DB = 20  # Frames quieter than the loudest frame by this much are silence
+CROSSFADE_MS = 0  # Crossfade between joined clips in the audio summary
 
-    # Calculate the energy of the audio signal
-    energy = librosa.feature.rms(y=y)[0]
+def load_samples(file_path):
+    """Returns (samples, sample_rate) without copying the file into memory when possible.
 
-    # Detect silent parts based on energy threshold
-    silence_threshold = np.mean(energy) * 0.5  # Customize this threshold
-    non_silent_intervals = librosa.effects.split(y, top_db=20)
+    16-bit WAVs are memory-mapped (multi-channel files are mixed down per block);
+    other formats are decoded to 16 kHz mono with ffmpeg.
+    """
+    try:
+        return read_wav_memmap(file_path)
+    except ValueError:
+        return ffmpeg_load_audio(file_path), SAMPLE_RATE
 
-    # Extract dominant pitch (frequency)
-    pitches, magnitudes = librosa.core.piptrack(y=y, sr=sr)
-    pitch = [pitches[magnitudes[:, i].argmax()] for i in range(magnitudes.shape[1])]
+def _to_float(block):
+    if block.dtype == np.int16:
+        block = block.astype(np.float32) / 32768.0
+    if block.ndim > 1:
+        block = block.mean(axis=1)
+    return block
+
+def _frame_rms(block, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH):
+    """RMS of every full frame in a block, from a running sum of squares (no frame copies)."""
+    if len(block) < frame_length:
+        return np.zeros(0, dtype=np.float32)
+    n_frames = 1 + (len(block) - frame_length) // hop_length
+    squares = np.concatenate(([0.0], np.cumsum(block.astype(np.float64) ** 2)))
+    starts = np.arange(n_frames) * hop_length
+    return np.sqrt((squares[starts + frame_length] - squares[starts]) / frame_length).astype(np.float32)
+
+def _block_pitch(block, sr):
+    """Dominant pitch per frame of a block, picked with a vectorized argmax."""
+    import librosa
+    pitches, magnitudes = librosa.core.piptrack(y=block, sr=sr, n_fft=FRAME_LENGTH, hop_length=HOP_LENGTH, center=False)
+    return pitches[magnitudes.argmax(axis=0), np.arange(magnitudes.shape[1])]
+
+def nonsilent_intervals(rms, n_samples, top_db=SILENCE_TOP_DB, hop_length=HOP_LENGTH, frame_length=FRAME_LENGTH):
+    """Converts per-frame RMS into [start, end) sample intervals of non-silent audio."""
+    if len(rms) == 0 or rms.max() <= 0:
+        return np.zeros((0, 2), dtype=np.int64)
+    db = 20 * np.log10(np.maximum(rms, 1e-10) / rms.max())
+    loud = np.concatenate(([False], db > -top_db, [False]))
+    edges = np.flatnonzero(np.diff(loud.astype(np.int8)))
+    start_frames, end_frames = edges[0::2], edges[1::2]
+    starts = start_frames * hop_length
+    ends = np.minimum((end_frames - 1) * hop_length + frame_length, n_samples)
+    return np.stack([starts, ends], axis=1).astype(np.int64)
+
+# Step 1: Audio Analysis
+def analyze_audio(file_path, features=("intervals",)):
+    """Analyzes audio block by block, computing only the requested features.
+
+    `features` may contain "intervals" (non-silent sample ranges), "energy" (RMS per
+    frame) and "pitch" (dominant pitch per frame). Returns (energy, non_silent_intervals,
+    pitch), with None for anything not requested.
+    """
+    samples, sr = load_samples(file_path)
+    n_samples = len(samples)
+
+    block_step = BLOCK_FRAMES * HOP_LENGTH
+    block_span = block_step - HOP_LENGTH + FRAME_LENGTH  # Last frame of a block is complete
+
+    rms_blocks, pitch_blocks = [], []
+    for block_start in range(0, max(n_samples - FRAME_LENGTH, 0) + 1, block_step):
+        block = _to_float(np.asarray(samples[block_start:block_start + block_span]))
+        if "intervals" in features or "energy" in features:
+            rms_blocks.append(_frame_rms(block))
+        if "pitch" in features and len(block) >= FRAME_LENGTH:
+            pitch_blocks.append(_block_pitch(block, sr))
+
+    rms = np.concatenate(rms_blocks) if rms_blocks else np.zeros(0, dtype=np.float32)
+    energy = rms if "energy" in features else None
+    non_silent_intervals = nonsilent_intervals(rms, n_samples) if "intervals" in features else None
+    pitch = (np.concatenate(pitch_blocks) if pitch_blocks else np.zeros(0)) if "pitch" in features else None
 
     return energy, non_silent_intervals, pitch
 
+def write_wav(output_path, samples, sample_rate):
+    """Writes int16 samples ((frames,) or (frames, channels)) as a PCM WAV in one pass."""
+    channels = 1 if samples.ndim == 1 else samples.shape[1]
+    with wave.open(output_path, "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(np.ascontiguousarray(samples, dtype="<i2").tobytes())
+
 # Step 2: Audio Clipping based on Energy and Silence Detection
-def clip_audio(file_path, non_silent_intervals):
-    # Load audio file using PyDub (for easy manipulation)
-    audio = AudioSegment.from_file(file_path)
+def clip_audio(file_path, non_silent_intervals, output_path="clipped_audio.wav", crossfade_ms=CROSSFADE_MS):
+    """Joins the non-silent [start, end) sample intervals into one WAV.
+
+    Samples are gathered from the memory-mapped input into a single preallocated
+    buffer, so time is linear in the output length. With crossfade_ms > 0, consecutive
+    clips overlap by a linear crossfade. Returns output_path.
+    """
+    samples, sr = load_samples(file_path)
+    if samples.dtype != np.int16:
+        samples = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
 
-    # Create a new audio segment by combining non-silent intervals
-    clips = []
-    for start, end in non_silent_intervals:
-        clip = audio[start:end]  # Extract audio between start and end points
-        clips.append(clip)
+    intervals = [(int(start), int(end)) for start, end in non_silent_intervals if end > start]
+    lengths = [end - start for start, end in intervals]
 
-    # Combine all clips into one
-    final_clip = sum(clips)
+    # Overlap at each junction, never longer than either neighbouring clip
+    fade = int(sr * crossfade_ms / 1000)
+    overlaps = [0] + [min(fade, lengths[i - 1], lengths[i]) for i in range(1, len(intervals))]
+
+    shape = (sum(lengths) - sum(overlaps),) + samples.shape[1:]
+    if fade == 0:
+        output = np.empty(shape, dtype=np.int16)
+        position = 0
+        for start, end in intervals:
+            output[position:position + end - start] = samples[start:end]
+            position += end - start
+    else:
+        output = np.zeros(shape, dtype=np.float32)
+        position = 0
+        for (start, end), overlap in zip(intervals, overlaps):
+            clip = np.asarray(samples[start:end], dtype=np.float32)
+            position -= overlap
+            if overlap:
+                ramp = np.linspace(0.0, 1.0, overlap, dtype=np.float32)
+                if clip.ndim > 1:
+                    ramp = ramp[:, None]
+                output[position:position + overlap] = output[position:position + overlap] * (1 - ramp) + clip[:overlap] * ramp
+            output[position + overlap:position + len(clip)] = clip[overlap:]
+            position += len(clip)
+        output = np.clip(np.round(output), -32768, 32767).astype(np.int16)
 
     # Export the clipped audio to a new file
-    final_clip.export("clipped_audio.wav", format="wav")
-    print("Clipped audio saved as 'clipped_audio.wav'")
+    write_wav(output_path, output, sr)
+    print(f"Clipped audio saved as '{output_path}' ({len(intervals)} clips, {len(output) / sr:.1f}s)")
 
-    return final_clip  # Return the final clipped audio
+    return output_path
 
 # Step 3: Putting It All Together
-def create_audio_summary(file_path):
-    # Step 1: Analyze audio for pitch, energy, and silence
-    energy, non_silent_intervals, pitch = analyze_audio(file_path)
-
-    # Step 2: Clip the audio based on silence and energy thresholds
-    output = clip_audio(file_path, non_silent_intervals)
-
-    # Step 3: Save the final clipped audio as a file and return the file path
-    output_file_path = "clipped_audio.wav"
-    output.export(output_file_path, format="wav")
-    
-    # Return the path to the saved audio file
-    return output_file_path  # Return the path to the saved file
+def create_audio_summary(file_path, output_path="clipped_audio.wav"):
+    record_input_audio(file_path)
+
+    # Step 1: Find non-silent parts (the only feature this summary uses)
+    report_stage("summarize")
+    _, non_silent_intervals, _ = analyze_audio(file_path, features=("intervals",))
+
+    # Step 2: Clip the audio based on silence and write the summary once
+    report_stage("encode")
+    return clip_audio(file_path, non_silent_intervals, output_path)
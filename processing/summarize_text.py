@@ -1,99 +1,197 @@
 import os
-from transformers import pipeline, AutoTokenizer
 from .download_audio import extract_audio_from_video, transcribe_audio
+from .models import get_model, generation_beams
+from .jobs import report_stage
+from .metrics import record_input_audio
+from .transcribe import transcribe_stream
+from .streaming import BackgroundStage, STREAMING_PIPELINE
 
-# Load pre-trained BART summarization model
+# Pre-trained BART summarization model, loaded lazily through the model registry
 model_name = "facebook/bart-large-cnn"
-summarizer = pipeline("summarization", model=model_name)
-tokenizer = AutoTokenizer.from_pretrained(model_name)
 
-# Get the model's max token limit
-MAX_TOKEN_LIMIT = tokenizer.model_max_length
+def get_summarizer():
+    """Returns the shared (summarizer pipeline, tokenizer) pair."""
+    return get_model("bart", model_name)
 
-# Function to split large text into smaller chunks
-def split_text(text, max_chunk_size=MAX_TOKEN_LIMIT):  
-    sentences = text.split('. ')  
-    chunks, current_chunk = [], ""
+# Beam count bart-large-cnn is configured with
+BART_NUM_BEAMS = 4
 
-    for sentence in sentences:
-        if len(current_chunk) + len(sentence) < max_chunk_size:
-            current_chunk += sentence + ". "
-        else:
-            chunks.append(current_chunk.strip())
-            current_chunk = sentence + ". "
+# Batch size for BART inference and token overlap between consecutive chunks
+SUMMARY_BATCH_SIZE = int(os.environ.get("SUMMARY_BATCH_SIZE", "4"))
+CHUNK_OVERLAP_TOKENS = int(os.environ.get("CHUNK_OVERLAP_TOKENS", "0"))
 
-    if current_chunk:
-        chunks.append(current_chunk.strip())
+# Function to split large text into smaller chunks
+def split_text(text, max_chunk_size=None, overlap=CHUNK_OVERLAP_TOKENS, tokenizer=None):  
+    """Splits text at sentence boundaries into chunks of at most max_chunk_size tokens.
+
+    Lengths are measured with the model tokenizer. With overlap > 0, each chunk
+    starts with the trailing sentences (up to `overlap` tokens) of the previous one.
+    Sentences longer than a whole chunk are cut at token boundaries.
+    """
+    if tokenizer is None:
+        tokenizer = get_summarizer()[1]
+    if max_chunk_size is None:
+        # Get the model's max token limit
+        max_chunk_size = tokenizer.model_max_length
+    budget = max_chunk_size - tokenizer.num_special_tokens_to_add()
+
+    sentences = [sentence.strip() for sentence in text.split('. ') if sentence.strip()]
+    if not sentences:
+        return []
+    sentences = [sentence if sentence.endswith('.') else sentence + "." for sentence in sentences]
+
+    # Tokenize all sentences in one call; each sentence costs its own token count
+    token_ids = tokenizer(sentences, add_special_tokens=False)["input_ids"]
+    pieces = []
+    for sentence, ids in zip(sentences, token_ids):
+        if len(ids) <= budget:
+            pieces.append((sentence, len(ids)))
+            continue
+        for start in range(0, len(ids), budget):
+            window = ids[start:start + budget]
+            pieces.append((tokenizer.decode(window, skip_special_tokens=True), len(window)))
+
+    chunks, current, current_tokens = [], [], 0
+    for piece, length in pieces:
+        if current and current_tokens + length > budget:
+            chunks.append(" ".join(p for p, _ in current))
+
+            # Carry trailing sentences over as overlap
+            carried, carried_tokens = [], 0
+            for p, l in reversed(current):
+                if carried_tokens + l > overlap or carried_tokens + l + length > budget:
+                    break
+                carried.insert(0, (p, l))
+                carried_tokens += l
+            current, current_tokens = carried, carried_tokens
+
+        current.append((piece, length))
+        current_tokens += length
+
+    if current:
+        chunks.append(" ".join(p for p, _ in current))
 
     return chunks
 
+def _length_limits(chunks):
+    """Summary length limits for a batch, based on its average input length in words."""
+    input_length = sum(len(chunk.split()) for chunk in chunks) // len(chunks)
+    max_length = max(50, int(input_length * 0.6))  
+    min_length = max(20, int(max_length * 0.5))
+    return max_length, min_length
+
 # Function to summarize large text
-def summarize_text(transcript_text):
+def summarize_text(transcript_text, batch_size=SUMMARY_BATCH_SIZE):
     if not transcript_text.strip():
         print("⚠️ Transcript is empty. Skipping summarization.")
         return "No valid text found to summarize."
 
-    chunks = split_text(transcript_text)  
-    summaries = []
+    summarizer, tokenizer = get_summarizer()
+    chunks = split_text(transcript_text, tokenizer=tokenizer)  
+    summaries = [None] * len(chunks)
 
     print(f"🔹 Splitting text into {len(chunks)} chunks...")
 
-    for i, chunk in enumerate(chunks):  
-        input_length = len(chunk.split())
-        max_length = max(50, int(input_length * 0.6))  
-        min_length = max(20, int(max_length * 0.5))
-
-        print(f"📝 Summarizing chunk {i+1}/{len(chunks)}...")
+    # Sort by length so each padded batch holds chunks of similar size
+    lengths = [len(ids) for ids in tokenizer(chunks, add_special_tokens=False)["input_ids"]]
+    order = sorted(range(len(chunks)), key=lambda i: lengths[i], reverse=True)
 
-        try:
-            summary = summarizer(chunk, max_length=max_length, min_length=min_length, do_sample=False)[0]['summary_text']
-            summaries.append(summary)
-        except Exception as e:
-            print(f"❌ Error summarizing chunk {i+1}: {e}")
-            summaries.append("[Summary error]")
+    for batch_start in range(0, len(order), batch_size):
+        batch = order[batch_start:batch_start + batch_size]
+        print(f"📝 Summarizing chunks {batch_start + 1}-{batch_start + len(batch)}/{len(chunks)}...")
+        for i, summary in zip(batch, summarize_batch(summarizer, [chunks[i] for i in batch])):
+            summaries[i] = summary
 
     return " ".join(summaries)
 
+def summarize_batch(summarizer, batch_chunks):
+    """Summarizes a list of chunks in one padded pipeline call."""
+    max_length, min_length = _length_limits(batch_chunks)
+    try:
+        results = summarizer(batch_chunks, max_length=max_length, min_length=min_length,
+                             do_sample=False, num_beams=generation_beams(BART_NUM_BEAMS),
+                             truncation=True, batch_size=len(batch_chunks))
+        return [result['summary_text'] for result in results]
+    except Exception as e:
+        print(f"❌ Error summarizing {len(batch_chunks)} chunks: {e}")
+        return ["[Summary error]"] * len(batch_chunks)
+
+def summarize_segment_stream(windows):
+    """Summarizes a transcript while it is still being produced.
+
+    `windows` yields lists of transcript segments (see transcribe.transcribe_stream).
+    Whenever the text received so far fills a chunk, the chunk is summarized on a
+    background thread. Returns (transcript_text, summary).
+    """
+    summarizer, tokenizer = get_summarizer()
+    budget = tokenizer.model_max_length - tokenizer.num_special_tokens_to_add()
+    stage = BackgroundStage(lambda chunk: summarize_batch(summarizer, [chunk])[0], "summarize")
+
+    texts, pending, pending_tokens = [], [], 0
+    for window in windows:
+        for segment in window:
+            text = segment["text"]
+            texts.append(text)
+            length = len(tokenizer(text, add_special_tokens=False)["input_ids"])
+            if pending and pending_tokens + length > budget:
+                stage.submit(" ".join(pending))
+                pending, pending_tokens = [], 0
+            pending.append(text)
+            pending_tokens += length
+    if pending:
+        stage.submit(" ".join(pending))
+
+    summaries = stage.finish()
+    print(f"🔹 Summarized {len(summaries)} chunks while transcribing")
+    return " ".join(texts), " ".join(summaries)
+
 # Main function to process a video
-def summarizeText(video):
+def summarizeText(video, work_dir="data", streaming=STREAMING_PIPELINE):
     if not video or not os.path.exists(video):
         raise FileNotFoundError("❌ Invalid or missing video file.")
 
     print("🎬 Processing video:", video)
 
     # Step 1: Extract audio
-    wav_file = extract_audio_from_video(video)
+    report_stage("extract")
+    wav_file = extract_audio_from_video(video, work_dir)
     if not wav_file or not os.path.exists(wav_file):
         raise FileNotFoundError("❌ Failed to extract audio.")
+    record_input_audio(wav_file)
 
     # Step 2: Transcribe the extracted audio
-    transcript_file = transcribe_audio(wav_file)
-    if not transcript_file or not os.path.exists(transcript_file):
-        raise FileNotFoundError("❌ Failed to transcribe audio.")
-
-    print(f"✅ Transcript saved to: {transcript_file}")
-
-    # Step 3: Read the transcript
-    with open(transcript_file, "r", encoding="utf-8") as file:
-        transcript_text = file.read().strip()
-
-    if not transcript_text:
-        return "⚠️ Transcript is empty. No summary generated."
-
-    # Step 4: Generate summary
-    summary = summarize_text(transcript_text)
+    report_stage("transcribe")
+    if streaming:
+        # Steps 2-4 overlap: chunks are summarized while later audio is transcribed
+        transcript_text, summary = summarize_segment_stream(transcribe_stream(wav_file))
+        transcript_text = transcript_text.strip()
+        report_stage("summarize")
+        if not transcript_text:
+            summary = "⚠️ Transcript is empty. No summary generated."
+    else:
+        transcript_file = transcribe_audio(wav_file, work_dir)
+        if not transcript_file or not os.path.exists(transcript_file):
+            raise FileNotFoundError("❌ Failed to transcribe audio.")
+
+        print(f"✅ Transcript saved to: {transcript_file}")
+
+        # Step 3: Read the transcript
+        with open(transcript_file, "r", encoding="utf-8") as file:
+            transcript_text = file.read().strip()
+
+        # Step 4: Generate summary
+        report_stage("summarize")
+        if transcript_text:
+            summary = summarize_text(transcript_text)
+        else:
+            summary = "⚠️ Transcript is empty. No summary generated."
 
     # Step 5: Save the summary
-    summary_dir = "data"
-    os.makedirs(summary_dir, exist_ok=True)  
-    summary_file = os.path.join(summary_dir, "summary.txt")
+    os.makedirs(work_dir, exist_ok=True)  
+    summary_file = os.path.join(work_dir, "summary.txt")
 
     with open(summary_file, "w", encoding="utf-8") as file:
         file.write(summary)
 
     print(f"✅ Summary saved to: {summary_file}")
-    os.remove("data/extracted_audio.wav")
-    os.remove("data/summary.txt")
-    os.remove("data/transcript.txt")
-    os.remove("downloads/video.mp4")
     return summary_file
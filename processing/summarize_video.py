@@ -1,63 +1,100 @@
 import os
 import json
-from .download_audio import extract_audio_from_video, transcribe_audio
+from .download_audio import extract_audio_from_video
+from .transcribe import transcribe
+from .streaming import STREAMING_PIPELINE
+from .timestamps import transcribe_and_embed
+from .extractive import extractive_summary
 from .summary_text import summarize_text_with_t5
 from .timestamps import generate_timestamps_based_on_summary
 from .generatevideo import generate_summarized_video
+from .segments import plan_segments
 from .download import download_youtube_video
-
-def summarize(video):
+from .jobs import report_stage
+from .metrics import record_input_audio
+from .audio_io import read_wav_memmap
+
+def _media_duration(wav_file, segments):
+    """Length of the extracted audio in seconds; falls back to the end of the last segment."""
+    try:
+        samples, sample_rate = read_wav_memmap(wav_file)
+        return len(samples) / sample_rate
+    except Exception as e:
+        print(f"⚠️ Could not read duration from {wav_file}: {e}")
+        return segments[-1]["end"] if segments else None
+
+def summarize(video, work_dir="data", output_video_filename="output_video.mp4", streaming=STREAMING_PIPELINE, on_preview=None, extractive=False):
+    """Builds the summary video. With extractive=True the cuts come straight from the
+    selected transcript segments, skipping T5 generation and timestamp re-matching."""
     if not video:
-        print("Failed to download the video.")
-        exit(1)  # Stop execution if video download fails
+        raise RuntimeError("Failed to download the video.")  # Stop execution if video download fails
 
     # Step 1: Extract audio
-    wav_file = extract_audio_from_video(video)
+    report_stage("extract")
+    wav_file = extract_audio_from_video(video, work_dir)
 
     if not wav_file:
-        print("Failed to extract audio from the video.")
-        exit(1)  # Stop execution if audio extraction fails
-
-    # Step 2: Transcribe the extracted audio
-    transcript_file = transcribe_audio(wav_file)
-
-    if not transcript_file:
-        print("Failed to transcribe audio.")
-        exit(1)  # Stop execution if transcription fails
+        raise RuntimeError("Failed to extract audio from the video.")  # Stop execution if audio extraction fails
+    record_input_audio(wav_file)
+
+    # Step 2: Transcribe the extracted audio once (text + segments, cached by audio hash)
+    report_stage("transcribe")
+    segment_embeddings = None
+    try:
+        if streaming:
+            # Segment embeddings are computed while later windows are still being transcribed
+            transcript, segment_embeddings = transcribe_and_embed(wav_file)
+        else:
+            transcript = transcribe(wav_file)
+    except Exception as e:
+        raise RuntimeError(f"Failed to transcribe audio: {e}") from e  # Stop execution if transcription fails
+
+    transcript_text = transcript["text"]
+    transcript_file = os.path.join(work_dir, "transcript.txt")
+    with open(transcript_file, "w", encoding="utf-8") as file:
+        file.write(transcript_text)
 
     print(f"Transcript saved to: {transcript_file}")
 
-    with open("data/transcript.txt", "r", encoding="utf-8") as file:
-        transcript_text = file.read()
-
-    # Step 3: Summarize text
-    print("[Step 3] Summarizing transcript...")
-    summary = summarize_text_with_t5(transcript_text)
+    if extractive:
+        # Steps 3-4: the selected segments already carry their timestamps
+        print("[Step 3] Selecting key segments...")
+        report_stage("summarize")
+        timestamps = extractive_summary(transcript.get("segments", []), segment_embeddings)
+    else:
+        # Step 3: Summarize text
+        print("[Step 3] Summarizing transcript...")
+        report_stage("summarize")
+        summary = summarize_text_with_t5(transcript_text)
 
-    if not summary:
-        print("Failed to summarize the transcript.")
-        exit(1)
+        if not summary:
+            raise RuntimeError("Failed to summarize the transcript.")
 
+        print(summary)
 
-
-    print(summary)
-
-    # Step 4: Match timestamps
-    print("[Step 4] Finding matching timestamps...")
-    timestamps = generate_timestamps_based_on_summary(wav_file,summary)
+        # Step 4: Match timestamps
+        print("[Step 4] Finding matching timestamps...")
+        report_stage("align")
+        timestamps = generate_timestamps_based_on_summary(wav_file, summary, None, transcript=transcript, segment_embeddings=segment_embeddings)
 
     if not timestamps:
-        print("Failed to generate timestamps.")
-        exit(1)
+        raise RuntimeError("Failed to generate timestamps.")
+
+    # Merge adjacent matches into fewer, longer cuts
+    plan = plan_segments(timestamps, duration=_media_duration(wav_file, transcript.get("segments", [])))
+    print(f"Planned {len(plan)} cuts from {len(timestamps)} matched segments")
 
-    # Save timestamps
-    with open("data/timestamps.json", "w") as f:
-        json.dump(timestamps, f, indent=2)
+    # Save raw matches and the cut plan
+    timestamps_file = os.path.join(work_dir, "timestamps.json")
+    with open(timestamps_file, "w") as f:
+        json.dump({"matches": timestamps, "plan": plan}, f, indent=2)
 
     # Step 5: Generate summarized video
     print("[Step 5] Generating summarized video...")
+    report_stage("encode")
 
-    output=generate_summarized_video(video, timestamps)
+    # A low-resolution preview is handed to on_preview first when the render re-encodes
+    output=generate_summarized_video(video, plan, output_video_filename, work_dir, on_preview=on_preview)
     return output
 
 
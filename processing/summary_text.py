@@ -1,27 +1,126 @@
-from transformers import T5Tokenizer, T5ForConditionalGeneration
+import hashlib
+import json
+import os
 import torch
+from .models import get_model, generation_beams, inference_backend
+from .summarize_text import split_text
+from .disk_cache import temp_path, touch, prune
 
-def summarize_text_with_t5(text, model_name="t5-small"):  
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32  # Use fp16 if CUDA
+# Transcripts longer than one T5 window are summarized hierarchically: each window is
+# summarized, the summaries are joined and summarized again until the text fits in a
+# single window, and the final pass produces the requested length.
+T5_WINDOW_TOKENS = int(os.environ.get("T5_WINDOW_TOKENS", "1024"))
+T5_BATCH_SIZE = int(os.environ.get("T5_BATCH_SIZE", "4"))  # Windows generated together
+INTERMEDIATE_MAX_LENGTH = 200
+INTERMEDIATE_MIN_LENGTH = 50
+MAX_LEVELS = 6
+T5_MODEL = "t5-small"
+T5_NUM_BEAMS = 3  # Reduced for faster speed
+
+# Every window summary is cached by model, length limits and input text, so changing
+# only the final length reuses all the lower levels
+SUMMARY_CACHE_DIR = os.path.join("data", "summary_cache")
+SUMMARY_CACHE_MAX_MB = int(os.environ.get("SUMMARY_CACHE_MAX_MB", "200"))  # Least recently used entries go first
+
+def _cache_path(model_name, max_length, min_length, text):
+    payload = [model_name, max_length, min_length, text]
+    # Quantized or fast-mode summaries differ from the default ones, so they get their own entries
+    variant = [inference_backend(), generation_beams(T5_NUM_BEAMS)]
+    if variant != ["fp32", T5_NUM_BEAMS]:
+        payload.append(variant)
+    payload = json.dumps(payload)
+    key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return os.path.join(SUMMARY_CACHE_DIR, f"{key}.json")
+
+def _load_cached(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            summary = json.load(f)["summary"]
+    except (OSError, ValueError, KeyError):
+        return None
+    touch(path)
+    return summary
+
+def _save_cached(path, summary):
+    tmp_path = temp_path(path)
+    try:
+        os.makedirs(SUMMARY_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Could not cache window summary {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
-    model = T5ForConditionalGeneration.from_pretrained(model_name, torch_dtype=torch_dtype).to(device)
-    tokenizer = T5Tokenizer.from_pretrained(model_name)
+def _generate(model, tokenizer, texts, max_length, min_length):
+    device = "cuda" if torch.cuda.is_available() else "cpu"
 
-    input_text = "summarize: " + text
-    inputs = tokenizer(input_text, return_tensors="pt", truncation=True, padding="longest", max_length=1024).to(device)
+    input_texts = ["summarize: " + text for text in texts]
+    inputs = tokenizer(input_texts, return_tensors="pt", truncation=True, padding="longest", max_length=T5_WINDOW_TOKENS).to(device)
 
     with torch.no_grad():
         summary_ids = model.generate(
             inputs['input_ids'],
-            max_length=600,  
-            min_length=250,
-            num_beams=3,  # Reduced for faster speed
-            length_penalty=1.5,  
+            attention_mask=inputs['attention_mask'],
+            max_length=max_length,
+            min_length=min_length,
+            num_beams=generation_beams(T5_NUM_BEAMS),
+            length_penalty=1.5,
             early_stopping=True,
-            repetition_penalty=2.0,  
-            no_repeat_ngram_size=3  
+            repetition_penalty=2.0,
+            no_repeat_ngram_size=3
         )
 
-    summary = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+    return tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
+
+def summarize_windows(model, tokenizer, model_name, windows, max_length, min_length, batch_size=T5_BATCH_SIZE):
+    """Summarizes each window, reusing cached summaries and batching the rest."""
+    summaries = [None] * len(windows)
+    cache_paths = [_cache_path(model_name, max_length, min_length, window) for window in windows]
+
+    pending = []
+    for i, path in enumerate(cache_paths):
+        summaries[i] = _load_cached(path)
+        if summaries[i] is None:
+            pending.append(i)
+    if len(pending) < len(windows):
+        print(f"🔹 Reusing {len(windows) - len(pending)}/{len(windows)} cached window summaries")
+
+    # Similar lengths in a batch keep padding small
+    pending.sort(key=lambda i: len(windows[i]), reverse=True)
+    for batch_start in range(0, len(pending), batch_size):
+        batch = pending[batch_start:batch_start + batch_size]
+        results = _generate(model, tokenizer, [windows[i] for i in batch], max_length, min_length)
+        for i, summary in zip(batch, results):
+            summaries[i] = summary
+            _save_cached(cache_paths[i], summary)
+
+    if pending:
+        prune(SUMMARY_CACHE_DIR, SUMMARY_CACHE_MAX_MB)
+    return summaries
+
+def summarize_text_with_t5(text, model_name=T5_MODEL, max_length=600, min_length=250):
+    """Summarizes text of any length with T5, covering the whole input.
+
+    Text that fits in one window gets a single pass; longer text is reduced level by
+    level (map-reduce) first.
+    """
+    # Shared T5 instance from the model registry (loaded once per process)
+    model, tokenizer = get_model("t5", model_name)
+
+    prefix_tokens = len(tokenizer("summarize: ", add_special_tokens=False)["input_ids"])
+    window = T5_WINDOW_TOKENS - prefix_tokens
+
+    for level in range(1, MAX_LEVELS + 1):
+        if len(tokenizer(text)["input_ids"]) <= window:
+            break
+        windows = split_text(text, max_chunk_size=window, tokenizer=tokenizer)
+        print(f"🔹 Level {level}: summarizing {len(windows)} windows...")
+        summaries = summarize_windows(model, tokenizer, model_name, windows, INTERMEDIATE_MAX_LENGTH, INTERMEDIATE_MIN_LENGTH)
+        text = " ".join(summaries)
+
+    summary = summarize_windows(model, tokenizer, model_name, [text], max_length, min_length)[0]
     return summary
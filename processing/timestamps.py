@@ -1,49 +1,100 @@
-import spacy
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-from whisper import load_model
+from .transcribe import transcribe, transcribe_stream
+from .models import get_model
+from .embeddings import encode, encode_cached, save_cached_embeddings
+from .streaming import BackgroundStage
 import json
 import os
 
-# Load optimized models once (avoid reloading multiple times)
-nlp = spacy.load("en_core_web_sm")  # Smaller SpaCy model
-model = SentenceTransformer('paraphrase-MiniLM-L6-v2')  # Faster sentence embedding model
-whisper_model = load_model("tiny")  # Load Whisper once globally
-
-def get_matching_timestamps(transcribed_text, summarized_text, transcribed_timestamps, similarity_threshold=0.5):
-    """Find timestamps for summarized sentences based on transcribed text similarity."""
-
-
-    
-    transcribed_sentences = [sent.text.strip() for sent in nlp(transcribed_text).sents]
-    summarized_sentences = [sent.text.strip() for sent in nlp(summarized_text).sents]
-
-    # Batch process embeddings (Faster)
-    transcribed_embeddings = model.encode(transcribed_sentences, batch_size=8, convert_to_numpy=True)
-    summarized_embeddings = model.encode(summarized_sentences, batch_size=8, convert_to_numpy=True)
+# Models are shared through the registry and loaded on first use
+SPACY_MODEL = "en_core_web_sm"  # Smaller SpaCy model
+EMBEDDING_MODEL = "paraphrase-MiniLM-L6-v2"  # Faster sentence embedding model
+ALIGNMENT_TOP_K = 5  # Candidate segments kept per summary sentence
+
+def assign_top_k(similarities, similarity_threshold, top_k=ALIGNMENT_TOP_K):
+    """Assigns each summary sentence (row) to a distinct segment (column).
+
+    Keeps the top_k candidates per row, then accepts (row, column) pairs in order of
+    decreasing score, skipping rows or columns that are already taken. Returns a list
+    of (row, column, score).
+    """
+    n_rows, n_cols = similarities.shape
+    if n_rows == 0 or n_cols == 0:
+        return []
+    k = min(top_k, n_cols)
+
+    # Top-k columns per row without a full sort
+    columns = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    scores = np.take_along_axis(similarities, columns, axis=1)
+    rows = np.repeat(np.arange(n_rows), k)
+    columns, scores = columns.ravel(), scores.ravel()
+
+    keep = scores > similarity_threshold
+    rows, columns, scores = rows[keep], columns[keep], scores[keep]
+    order = np.argsort(-scores, kind="stable")
+
+    assigned_rows = np.zeros(n_rows, dtype=bool)
+    assigned_cols = np.zeros(n_cols, dtype=bool)
+    assignment = []
+    for row, column, score in zip(rows[order], columns[order], scores[order]):
+        if assigned_rows[row] or assigned_cols[column]:
+            continue
+        assigned_rows[row] = assigned_cols[column] = True
+        assignment.append((int(row), int(column), float(score)))
+    return assignment
+
+def transcribe_and_embed(wav_file):
+    """Streams the transcription and embeds each finished window in the background.
+
+    Returns (transcript, segment_embeddings) in the same shapes as transcribe() and
+    the timestamp matcher use.
+    """
+    embedder = BackgroundStage(lambda texts: encode(texts, EMBEDDING_MODEL), "embed")
+    segments = []
+    for window in transcribe_stream(wav_file):
+        if window:
+            segments.extend(window)
+            embedder.submit([segment["text"] for segment in window])
+
+    blocks = embedder.finish()
+    texts = [segment["text"] for segment in segments]
+    segment_embeddings = np.concatenate(blocks) if blocks else None
+    if segment_embeddings is not None:
+        save_cached_embeddings(texts, EMBEDDING_MODEL, segment_embeddings)
+    return {"text": " ".join(texts), "segments": segments}, segment_embeddings
+
+def get_matching_timestamps(segments, summarized_text, similarity_threshold=0.5, segment_embeddings=None):
+    """Find timestamps for summarized sentences by matching them against Whisper segments.
+
+    `segments` are the transcript segments ({"start", "end", "text"}) from
+    processing.transcribe; each is embedded directly, so a match maps straight to its
+    own timestamps. All similarities come from one normalized matrix product.
+    `segment_embeddings` may be passed in when they were computed ahead of time
+    (streaming mode); they must match the non-empty segments in order.
+    """
+    nlp = get_model("spacy", SPACY_MODEL)
+
+    segments = [segment for segment in segments if segment.get("text", "").strip()]
+    segment_texts = [segment["text"].strip() for segment in segments]
+    summarized_sentences = [sent.text.strip() for sent in nlp(summarized_text).sents if sent.text.strip()]
+    if not segment_texts or not summarized_sentences:
+        return []
+
+    # Unit vectors make the dot product the cosine; segment embeddings are cached on disk
+    if segment_embeddings is None or len(segment_embeddings) != len(segment_texts):
+        segment_embeddings = encode_cached(segment_texts, EMBEDDING_MODEL)
+    summarized_embeddings = encode(summarized_sentences, EMBEDDING_MODEL)
+    similarities = summarized_embeddings @ segment_embeddings.T
 
     matching_timestamps = []
-    seen_sentences = set()
-
-    for i, summarized_sentence in enumerate(summarized_sentences):
-        # Compute cosine similarity efficiently
-        similarities = cosine_similarity([summarized_embeddings[i]], transcribed_embeddings)[0]
-        best_match_index = np.argmax(similarities)
-        best_match_score = similarities[best_match_index]
-
-        # Ensure sentence is unique and score is above threshold
-        if best_match_score > similarity_threshold and transcribed_sentences[best_match_index] not in seen_sentences:
-            seen_sentences.add(transcribed_sentences[best_match_index])
-
-            # Check if timestamps exist (avoid index errors)
-            if best_match_index < len(transcribed_timestamps):
-                matching_timestamps.append({
-                    "start_time": transcribed_timestamps[best_match_index][0],
-                    "end_time": transcribed_timestamps[best_match_index][1],
-                    "matched_sentence": transcribed_sentences[best_match_index],
-                    "similarity_score": round(float(best_match_score), 4)
-                })
+    for _, segment_index, score in assign_top_k(similarities, similarity_threshold):
+        segment = segments[segment_index]
+        matching_timestamps.append({
+            "start_time": segment["start"],
+            "end_time": segment["end"],
+            "matched_sentence": segment_texts[segment_index],
+            "similarity_score": round(score, 4)
+        })
 
     # Sort timestamps to ensure chronological order
     matching_timestamps.sort(key=lambda x: x["start_time"])
@@ -51,21 +102,34 @@ def get_matching_timestamps(transcribed_text, summarized_text, transcribed_times
 
 
 def transcribe_audio(audio_path):
-    """Optimized Whisper transcription."""
+    """Whisper transcription through the shared, cached transcription stage."""
     if not os.path.exists(audio_path):
         raise FileNotFoundError(f"Audio file not found: {audio_path}")
     
-    result = whisper_model.transcribe(audio_path)  # No word timestamps (faster)
-    text = result.get('text', '')  # Get transcribed text
-    timestamps = [(segment['start'], segment['end']) for segment in result.get('segments', [])]
+    result = transcribe(audio_path)
+    return transcript_to_timestamps(result)
+
+
+def transcript_to_timestamps(transcript):
+    """Splits a transcript dict into its text and (start, end) segment pairs."""
+    text = transcript.get('text', '')  # Get transcribed text
+    timestamps = [(segment['start'], segment['end']) for segment in transcript.get('segments', [])]
     
     return text, timestamps
 
 
-def generate_timestamps_based_on_summary(audio_path, summarized_text, output_path="data/timestamps.json"):
-    """Generate timestamps based on summarized text and save as JSON."""
-    transcribed_text, transcribed_timestamps = transcribe_audio(audio_path)
-    matching_timestamps = get_matching_timestamps(transcribed_text, summarized_text, transcribed_timestamps)
+def generate_timestamps_based_on_summary(audio_path, summarized_text, output_path="data/timestamps.json", transcript=None, segment_embeddings=None):
+    """Generate timestamps based on summarized text and save as JSON.
+
+    Pass `transcript` (from processing.transcribe) to reuse an existing transcription,
+    and output_path=None to skip writing the JSON file.
+    """
+    if transcript is None:
+        transcript = transcribe(audio_path)
+    matching_timestamps = get_matching_timestamps(transcript.get("segments", []), summarized_text, segment_embeddings=segment_embeddings)
+
+    if output_path is None:
+        return matching_timestamps  # Caller saves the matches itself
 
     # Ensure the directory exists before saving
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -74,4 +138,3 @@ def generate_timestamps_based_on_summary(audio_path, summarized_text, output_pat
         json.dump(matching_timestamps, f, indent=2)
 
     return matching_timestamps
-
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import torch
+from .models import get_model, inference_lock
+from .audio_io import load_whisper_audio, read_wav_memmap, ffmpeg_load_audio, SAMPLE_RATE
+from .disk_cache import temp_path, touch, prune
+
+# Transcripts are cached on disk so repeated runs over the same audio skip Whisper
+TRANSCRIPT_CACHE_DIR = os.path.join("data", "transcripts")
+TRANSCRIPT_CACHE_MAX_MB = int(os.environ.get("TRANSCRIPT_CACHE_MAX_MB", "500"))  # Least recently used transcripts go first
+WHISPER_MODEL = "tiny"
+STREAM_WINDOW_SECONDS = 30  # Whisper's own context length
+
+def hash_file(file_path, chunk_size=1024 * 1024):
+    """Returns the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def transcript_cache_key(audio_hash, model_name, options):
+    """Builds the cache key from the audio hash, model name and decode options."""
+    payload = json.dumps({"audio": audio_hash, "model": model_name, "options": options}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _cache_path(key):
+    return os.path.join(TRANSCRIPT_CACHE_DIR, f"{key}.json")
+
+def load_cached_transcript(key):
+    """Returns the cached transcript for a key, or None if it is missing or unreadable."""
+    path = _cache_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            transcript = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable transcript cache {path}: {e}")
+        return None
+    touch(path)
+    return transcript
+
+def save_cached_transcript(key, transcript):
+    """Writes a transcript to the cache atomically; a failed write is logged, not raised."""
+    path = _cache_path(key)
+    tmp_path = temp_path(path)
+    try:
+        os.makedirs(TRANSCRIPT_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(transcript, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Could not cache transcript {path}: {e}")  # The transcript itself is still returned
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+    prune(TRANSCRIPT_CACHE_DIR, TRANSCRIPT_CACHE_MAX_MB)
+
+def transcribe(audio_path, model_name=WHISPER_MODEL, language="en", temperature=0):
+    """Transcribes audio once and returns {"text", "segments"}, using the on-disk cache when possible.
+
+    Each segment is a dict with "start", "end" (seconds) and "text".
+    """
+    if not audio_path or not os.path.exists(audio_path):
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    options = _decode_options(language, temperature)
+    key = transcript_cache_key(hash_file(audio_path), model_name, options)
+
+    cached = load_cached_transcript(key)
+    if cached is not None:
+        print(f"[Transcribe] Cache hit for {audio_path}")
+        return cached
+
+    # Imported here: the sharded path depends on the audio analysis modules, which import this one
+    from .sharded_transcribe import can_shard, transcribe_sharded
+    if can_shard(audio_path):
+        print(f"[Transcribe] Transcribing {audio_path} in shards with whisper-{model_name}")
+        transcript = transcribe_sharded(audio_path, model_name, options)
+        save_cached_transcript(key, transcript)
+        return transcript
+
+    print(f"[Transcribe] Transcribing {audio_path} with whisper-{model_name} on {device}")
+    model = get_model("whisper", model_name)
+    # Memory-mapped 16 kHz WAVs are handed to Whisper directly instead of re-decoding with ffmpeg
+    audio = load_whisper_audio(audio_path)
+    with inference_lock("whisper", model_name):
+        result = model.transcribe(audio, **options)
+
+    transcript = {
+        "text": result.get("text", ""),
+        "segments": [
+            {"start": segment["start"], "end": segment["end"], "text": segment["text"].strip()}
+            for segment in result.get("segments", [])
+        ],
+    }
+    save_cached_transcript(key, transcript)
+    return transcript
+
+def _decode_options(language, temperature):
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    return {"language": language, "temperature": temperature, "fp16": device == "cuda"}
+
+def transcribe_stream(audio_path, model_name=WHISPER_MODEL, language="en", temperature=0, window_seconds=STREAM_WINDOW_SECONDS):
+    """Transcribes audio window by window, yielding each window's segments as soon as it is done.
+
+    Segments have the same format as transcribe(), with global timestamps, and empty
+    segments are dropped. A cached transcript (from either mode) is yielded in one go;
+    a completed stream is cached for next time.
+    """
+    if not audio_path or not os.path.exists(audio_path):
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    options = _decode_options(language, temperature)
+    audio_hash = hash_file(audio_path)
+    full_key = transcript_cache_key(audio_hash, model_name, options)
+    stream_key = transcript_cache_key(audio_hash, model_name, dict(options, stream_window=window_seconds))
+
+    for key in (full_key, stream_key):
+        cached = load_cached_transcript(key)
+        if cached is not None:
+            print(f"[Transcribe] Cache hit for {audio_path}")
+            yield [segment for segment in cached["segments"] if segment["text"].strip()]
+            return
+
+    # Slice the memory-mapped WAV so only one window is converted at a time
+    try:
+        samples, sample_rate = read_wav_memmap(audio_path)
+        if sample_rate != SAMPLE_RATE or samples.ndim != 1:
+            raise ValueError("Not 16 kHz mono")
+        scale = 1 / 32768.0
+    except ValueError:
+        samples, scale = ffmpeg_load_audio(audio_path), 1.0
+
+    model = get_model("whisper", model_name)
+    window = window_seconds * SAMPLE_RATE
+    segments, texts = [], []
+    print(f"[Transcribe] Streaming {audio_path} in {window_seconds}s windows with whisper-{model_name}")
+
+    for window_start in range(0, len(samples), window):
+        audio = samples[window_start:window_start + window].astype("float32") * scale
+        offset = window_start / SAMPLE_RATE
+        # The previous window's text keeps wording consistent across the cut
+        prompt = texts[-1][-200:] if texts else None
+        # Held per window only, so other jobs can interleave between windows
+        with inference_lock("whisper", model_name):
+            result = model.transcribe(audio, initial_prompt=prompt, **options)
+
+        window_segments = [
+            {"start": round(offset + segment["start"], 3), "end": round(offset + segment["end"], 3), "text": segment["text"].strip()}
+            for segment in result.get("segments", [])
+            if segment["text"].strip()
+        ]
+        segments.extend(window_segments)
+        texts.append(result.get("text", "").strip())
+        yield window_segments
+
+    save_cached_transcript(stream_key, {"text": " ".join(text for text in texts if text), "segments": segments})
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+# Resumable chunked uploads: a client declares the file size, then sends chunks at
+# increasing offsets. Chunks are streamed to disk and hashed as they are written, so a
+# finished upload already has its SHA-256 (used for the result cache key). A dropped
+# connection resumes from the offset reported by get_upload().
+UPLOAD_ROOT = os.environ.get("UPLOAD_ROOT", "uploads")
+MAX_UPLOAD_MB = int(os.environ.get("MAX_UPLOAD_MB", "4096"))
+UPLOAD_TTL_SECONDS = int(os.environ.get("UPLOAD_TTL_SECONDS", str(24 * 3600)))  # Unfinished uploads expire
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Bytes read from the request stream at a time
+
+DATA_FILE = "data.bin"
+STATE_FILE = "state.json"
+
+class UploadError(Exception):
+    """An upload request that cannot be accepted; `status` is the HTTP status to return."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+_hashers = {}  # upload_id -> (sha256 object, bytes hashed so far)
+_locks = {}
+_locks_lock = threading.Lock()
+
+def max_upload_bytes():
+    return MAX_UPLOAD_MB * 1024 * 1024
+
+def _lock_for(upload_id):
+    with _locks_lock:
+        return _locks.setdefault(upload_id, threading.Lock())
+
+def _upload_dir(upload_id):
+    if not upload_id or len(upload_id) != 32 or not all(c in "0123456789abcdef" for c in upload_id):
+        raise UploadError("Unknown upload.", 404)
+    return os.path.join(UPLOAD_ROOT, upload_id)
+
+def _read_state(upload_id):
+    path = os.path.join(_upload_dir(upload_id), STATE_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        raise UploadError("Unknown upload.", 404)
+    # The data file is the source of truth for how much has arrived
+    state["offset"] = os.path.getsize(os.path.join(_upload_dir(upload_id), DATA_FILE))
+    return state
+
+def _write_state(upload_id, state):
+    path = os.path.join(_upload_dir(upload_id), STATE_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(f"{path}.tmp", path)
+
+def cleanup_uploads():
+    """Removes uploads that have not received data for UPLOAD_TTL_SECONDS."""
+    if not os.path.isdir(UPLOAD_ROOT):
+        return
+    cutoff = time.time() - UPLOAD_TTL_SECONDS
+    for name in os.listdir(UPLOAD_ROOT):
+        path = os.path.join(UPLOAD_ROOT, name)
+        if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+            _hashers.pop(name, None)
+
+def create_upload(filename, size):
+    """Starts an upload of `size` bytes; rejects anything over MAX_UPLOAD_MB up front."""
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError("Upload size is required.")
+    if size <= 0:
+        raise UploadError("Upload size must be positive.")
+    if size > max_upload_bytes():
+        raise UploadError(f"Upload exceeds the {MAX_UPLOAD_MB} MB limit.", 413)
+
+    cleanup_uploads()
+    upload_id = uuid.uuid4().hex
+    os.makedirs(_upload_dir(upload_id))
+    open(os.path.join(_upload_dir(upload_id), DATA_FILE), "wb").close()
+    state = {"id": upload_id, "filename": filename or "video.mp4", "size": size, "sha256": None, "created_at": time.time()}
+    _write_state(upload_id, state)
+    _hashers[upload_id] = (hashlib.sha256(), 0)
+    return dict(state, offset=0)
+
+def get_upload(upload_id):
+    """Returns the upload's state, including the offset to resume from."""
+    return _read_state(upload_id)
+
+def _hasher_at(upload_id, offset):
+    """Returns a sha256 object that has consumed exactly the first `offset` bytes."""
+    hasher, hashed = _hashers.get(upload_id, (None, -1))
+    if hashed == offset:
+        return hasher
+    # Lost after a restart or out of step: rebuild from what is on disk
+    hasher = hashlib.sha256()
+    with open(os.path.join(_upload_dir(upload_id), DATA_FILE), "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher
+
+def append_chunk(upload_id, offset, stream):
+    """Appends a chunk read from `stream` at `offset`, hashing it as it is written.
+
+    The offset must match what the server already has (otherwise 409 with the current
+    state so the client can resume). Returns the updated state.
+    """
+    with _lock_for(upload_id):
+        state = _read_state(upload_id)
+        if state["sha256"] is not None:
+            raise UploadError("Upload is already complete.", 409)
+        try:
+            offset = int(offset)
+        except (TypeError, ValueError):
+            raise UploadError("Chunk offset is required.")
+        if offset != state["offset"]:
+            raise UploadError(f"Expected offset {state['offset']}.", 409)
+
+        hasher = _hasher_at(upload_id, offset)
+        written = offset
+        data_path = os.path.join(_upload_dir(upload_id), DATA_FILE)
+        try:
+            with open(data_path, "ab") as f:
+                for chunk in iter(lambda: stream.read(UPLOAD_CHUNK_SIZE), b""):
+                    if written + len(chunk) > state["size"]:
+                        raise UploadError("Chunk goes past the declared upload size.", 413)
+                    f.write(chunk)
+                    hasher.update(chunk)
+                    written += len(chunk)
+        except UploadError:
+            # Drop the partial chunk so the client can resend it
+            with open(data_path, "ab") as f:
+                f.truncate(offset)
+            _hashers.pop(upload_id, None)
+            raise
+
+        _hashers[upload_id] = (hasher, written)
+        state["offset"] = written
+        if written == state["size"]:
+            state["sha256"] = hasher.hexdigest()
+            _hashers.pop(upload_id, None)
+        _write_state(upload_id, {key: value for key, value in state.items() if key != "offset"})
+        return state
+
+def take_upload(upload_id, target_dir):
+    """Moves a finished upload into target_dir and returns (path, sha256)."""
+    with _lock_for(upload_id):
+        state = _read_state(upload_id)
+        if state["sha256"] is None:
+            raise UploadError("Upload is not complete.", 409)
+        os.makedirs(target_dir, exist_ok=True)
+        target = os.path.join(target_dir, "upload_" + state["filename"])
+        shutil.move(os.path.join(_upload_dir(upload_id), DATA_FILE), target)
+        shutil.rmtree(_upload_dir(upload_id), ignore_errors=True)
+    with _locks_lock:
+        _locks.pop(upload_id, None)
+    return target, state["sha256"]
+
+def save_stream(stream, path):
+    """Writes a stream to path in chunks and returns its SHA-256, computed while writing."""
+    hasher = hashlib.sha256()
+    written = 0
+    with open(path, "wb") as f:
+        for chunk in iter(lambda: stream.read(UPLOAD_CHUNK_SIZE), b""):
+            written += len(chunk)
+            if written > max_upload_bytes():
+                raise UploadError(f"Upload exceeds the {MAX_UPLOAD_MB} MB limit.", 413)
+            f.write(chunk)
+            hasher.update(chunk)
+    return hasher.hexdigest()
@@ -0,0 +1,132 @@
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+
+# Each job gets its own directory under WORKSPACE_ROOT so concurrent requests never
+# share intermediate or output files. Finished outputs are registered as artifacts and
+# served by artifact ID. Old workspaces are removed once they pass WORKSPACE_TTL_SECONDS,
+# or oldest-first when the total size goes over WORKSPACE_QUOTA_MB.
+WORKSPACE_ROOT = os.environ.get("WORKSPACE_ROOT", "workspaces")
+WORKSPACE_TTL_SECONDS = int(os.environ.get("WORKSPACE_TTL_SECONDS", str(24 * 3600)))
+WORKSPACE_QUOTA_MB = int(os.environ.get("WORKSPACE_QUOTA_MB", "5000"))
+
+MANIFEST_FILE = "artifacts.json"
+_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+_active = set()  # Workspaces with a job still running; never cleaned up
+_lock = threading.Lock()
+
+def _is_valid_id(workspace_id):
+    return bool(workspace_id) and bool(_ID_PATTERN.match(workspace_id))
+
+def workspace_dir(workspace_id):
+    """Returns the directory of a workspace."""
+    if not _is_valid_id(workspace_id):
+        raise ValueError(f"Invalid workspace ID: {workspace_id!r}")
+    return os.path.join(WORKSPACE_ROOT, workspace_id)
+
+def create_workspace():
+    """Creates a fresh workspace directory and returns its ID."""
+    cleanup_workspaces()
+    workspace_id = uuid.uuid4().hex
+    path = workspace_dir(workspace_id)
+    os.makedirs(path)
+    with _lock:
+        _active.add(workspace_id)
+    return workspace_id
+
+def release_workspace(workspace_id):
+    """Marks a workspace's job as finished so it becomes eligible for cleanup."""
+    with _lock:
+        _active.discard(workspace_id)
+    path = workspace_dir(workspace_id)
+    if os.path.isdir(path):
+        os.utime(path)  # TTL counts from when the job finished
+
+def _read_manifest(workspace_id):
+    path = os.path.join(workspace_dir(workspace_id), MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def register_artifact(workspace_id, file_path, kind):
+    """Records an output file of a workspace and returns its artifact ID.
+
+    Artifact IDs have the form "<workspace_id>-<n>", so the owning workspace is
+    recoverable from the ID alone.
+    """
+    root = os.path.abspath(workspace_dir(workspace_id))
+    abs_path = os.path.abspath(file_path)
+    if os.path.commonpath([root, abs_path]) != root:
+        raise ValueError(f"Artifact {file_path} is outside workspace {workspace_id}")
+
+    with _lock:
+        manifest = _read_manifest(workspace_id)
+        artifact_id = f"{workspace_id}-{len(manifest)}"
+        manifest[artifact_id] = {"path": os.path.relpath(abs_path, root), "kind": kind, "created_at": time.time()}
+        manifest_path = os.path.join(root, MANIFEST_FILE)
+        with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+    return artifact_id
+
+def resolve_artifact(artifact_id):
+    """Returns (absolute path, kind) for an artifact ID, or None if unknown or cleaned up."""
+    workspace_id, _, _ = (artifact_id or "").partition("-")
+    if not _is_valid_id(workspace_id):
+        return None
+    try:
+        entry = _read_manifest(workspace_id).get(artifact_id)
+    except (OSError, ValueError):
+        return None
+    if entry is None:
+        return None
+    path = os.path.abspath(os.path.join(workspace_dir(workspace_id), entry["path"]))
+    if not os.path.exists(path):
+        return None
+    return path, entry["kind"]
+
+def _dir_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+def cleanup_workspaces():
+    """Removes expired workspaces, then the oldest ones until under the size quota."""
+    if not os.path.isdir(WORKSPACE_ROOT):
+        return
+    with _lock:
+        active = set(_active)
+
+    now = time.time()
+    candidates = []
+    total_size = 0
+    for workspace_id in os.listdir(WORKSPACE_ROOT):
+        path = os.path.join(WORKSPACE_ROOT, workspace_id)
+        if not _is_valid_id(workspace_id) or not os.path.isdir(path):
+            continue
+        size = _dir_size(path)
+        total_size += size
+        if workspace_id in active:
+            continue
+        candidates.append((os.path.getmtime(path), workspace_id, path, size))
+
+    candidates.sort()
+    quota = WORKSPACE_QUOTA_MB * 1024 * 1024
+    for mtime, workspace_id, path, size in candidates:
+        expired = now - mtime > WORKSPACE_TTL_SECONDS
+        if not expired and total_size <= quota:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total_size -= size
+        print(f"🧹 Removed workspace {workspace_id} ({'expired' if expired else 'over quota'})")